@@ -0,0 +1,179 @@
+"""
+Deterministic fast-path planner for the Planning agent.
+
+Most queries are "ticker(s) + maybe a city", and their plan is obvious:
+check the weather, then look up each stock. This module builds that plan
+locally when it can match the query with high confidence, saving the
+Phase 1 LLM call. Anything it is unsure about returns None so the agent
+falls back to the LLM planner (PLANNING_PROMPT).
+"""
+
+import re
+
+from config import DEFAULT_CITY, normalize_city
+from tools.prefetch import extract_cities, extract_tickers, tool_call_key, unresolved_names
+from tools.ticker_index import get_ticker_index, normalize_symbol
+
+# Requests the stock/current-weather plan cannot answer - leave these to the
+# LLM planner. Anything about another day or a later hour (a weekday, a
+# date, "tonight", "this afternoon") needs get_forecast rather than the
+# current weather.
+_UNSUPPORTED_RE = re.compile(
+    r"\b(news|earnings|dividends?|history|historical|yesterday|last (week|month|year)|"
+    r"compare|versus|vs\.?|forecast|tomorrow|tonight|next|this (week|weekend|afternoon|evening)|weekend|later|"
+    r"(mon|tues|wednes|thurs|fri|satur|sun)day|\d{4}-\d{2}-\d{2}|portfolio|options?)\b",
+    re.IGNORECASE,
+)
+
+# Words that mean the user is asking about the weather
+_WEATHER_RE = re.compile(r"\b(weather|rain\w*|sunny|temperature|outlook|umbrella)\b", re.IGNORECASE)
+
+# Upper-case tokens that look like tickers but are everyday words/abbreviations
+_NOT_TICKERS = {"AM", "PM", "CEO", "USA", "US", "UK", "EU", "NYC", "SF", "LDN", "OK", "AI", "ETF", "IPO"}
+_TICKER_LIKE_RE = re.compile(r"(?<![\w$])\$?[A-Z]{2,5}(?:[./-][A-Z])?(?![\w])")
+
+# Capitalized words that are just sentence structure, not a company name
+_STOPWORDS = {
+    "a", "about", "also", "an", "and", "any", "are", "at", "be", "but", "can", "check", "could", "did",
+    "do", "does", "for", "from", "get", "give", "hey", "hi", "how", "i", "i'd", "i'm", "if", "in", "is",
+    "it", "let", "let's", "look", "me", "my", "now", "of", "on", "or", "please", "should", "show", "so",
+    "stock", "stocks", "tell", "thanks", "the", "then", "there", "to", "today", "was", "we", "weather",
+    "were", "what", "when", "where", "which", "will", "with", "would",
+}
+
+
+def _has_unknown_tickers(query: str) -> bool:
+    """True if the query contains ticker-looking tokens we cannot resolve."""
+    index = get_ticker_index()
+    for token in _TICKER_LIKE_RE.findall(query):
+        symbol = normalize_symbol(token)
+        if symbol not in _NOT_TICKERS and symbol not in index:
+            return True
+    return False
+
+
+def _has_unknown_names(query: str) -> bool:
+    """True if a capitalized word outside the cities is neither a company, a ticker nor a stopword."""
+    for word in unresolved_names(query):
+        word = word.lower()
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word not in _STOPWORDS and word.upper() not in _NOT_TICKERS:
+            return True
+    return False
+
+
+def plan_locally(user_query: str) -> list[dict] | None:
+    """
+    Build a plan without the LLM when the query is simple enough.
+
+    Args:
+        user_query: The user's question
+
+    Returns:
+        A plan in the same shape as the LLM planner's output
+        ([{"tool": ..., "args": {...}}, ...]), or None if the query
+        needs the LLM planner.
+    """
+    if _UNSUPPORTED_RE.search(user_query) or _has_unknown_tickers(user_query) or _has_unknown_names(user_query):
+        # e.g. "NVDA and Palantir": names only match exactly ("Palantir Technologies"),
+        # so a plan built from what did match would silently drop PLTR
+        return None
+
+    tickers = extract_tickers(user_query)
+    cities = extract_cities(user_query)
+
+    if not tickers:
+        # A pure weather question ("Is it raining in London?") is still easy
+        if cities and _WEATHER_RE.search(user_query):
+            return [{"tool": "get_weather", "args": {"city": city.title()}} for city in cities]
+        return None
+
+    # Stock questions always get the weather too - that's the whole theory
+    cities = cities or [normalize_city(DEFAULT_CITY)]
+    plan = [{"tool": "get_weather", "args": {"city": city.title()}} for city in cities]
+    plan += [{"tool": "get_stock_price", "args": {"ticker": ticker}} for ticker in tickers]
+    return plan
+
+
+def _plan_keys(plan: list[dict]) -> set:
+    keys = set()
+    for step in plan:
+        if isinstance(step, dict):
+            tool = step.get("tool")
+            args = step.get("args") or {}
+            keys.add(tool_call_key(tool, args) or (tool, str(sorted(args.items()))))
+    return keys
+
+
+class FastPlannerStats:
+    """Hit rate of the fast path and how often it agrees with the LLM planner."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.queries = 0
+        self.hits = 0
+        self.compared = 0
+        self.agreed = 0
+
+    def snapshot(self) -> dict:
+        return {"queries": self.queries, "hits": self.hits, "compared": self.compared, "agreed": self.agreed}
+
+    def merge(self, snapshot: dict) -> None:
+        """Add the counters from another process's snapshot into this one."""
+        for name, value in snapshot.items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def record(self, plan: list[dict] | None) -> None:
+        """Record one planning attempt (plan is None on a fallback)."""
+        self.queries += 1
+        if plan is not None:
+            self.hits += 1
+
+    def record_agreement(self, fast_plan: list[dict], llm_plan: list[dict]) -> bool:
+        """Compare a fast-path plan to the LLM's plan for the same query (order-insensitive)."""
+        agreed = _plan_keys(fast_plan) == _plan_keys(llm_plan)
+        self.compared += 1
+        self.agreed += agreed
+        return agreed
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.queries if self.queries else 0.0
+
+    @property
+    def agreement_rate(self) -> float:
+        return self.agreed / self.compared if self.compared else 0.0
+
+    def report(self) -> str:
+        return (
+            f"Fast planner: {self.hits}/{self.queries} hits ({self.hit_rate:.0%}), "
+            f"agreement with LLM {self.agreed}/{self.compared} ({self.agreement_rate:.0%})"
+        )
+
+
+PLANNER_STATS = FastPlannerStats()
+
+
+if __name__ == "__main__":
+    for q in [
+        "What's the outlook for NVDA stock in NYC today?",
+        "Check MSFT and the weather in New York",
+        "Is it raining in London?",
+        "How are Apple and Tesla doing in Seattle?",
+        "How are NVDA and Palantir doing in Seattle?",
+        "What about Visa and Amazon in Tokyo?",
+        "How are Meta and Tesla doing in Seattle?",
+        "How is Meta doing? And Apple?",
+        "Is the weather in London bad for Meta?",
+        "Will it rain in London on Thursday?",
+        "Is it going to rain in London this afternoon?",
+        "What was the news on AAPL yesterday?",
+        "Tell me about XYZQ",
+    ]:
+        plan = plan_locally(q)
+        PLANNER_STATS.record(plan)
+        print(f"{q}\n  -> {plan}")
+    print(PLANNER_STATS.report())
@@ -9,13 +9,17 @@ based on the (fun) hypothesis that rainy days correlate with lower stock perform
 """
 
 import json
-import time
 
 import groq
-from groq import Groq
 
-from config import GROQ_API_KEY, GROQ_MODEL
-from tools import TOOLS, TOOL_FUNCTIONS
+from config import GROQ_MODEL, LLM_REQUEST_TIMEOUT
+from deadline import DeadlineExceeded, backoff_sleep, budget_low, timeout_for, with_deadline
+from llm_client import get_client
+from model_router import cascade, model_for
+from session import Session
+from tools import TOOLS, TOOL_FUNCTIONS, call_tool
+from tools.observation_encoding import encode_observations, observation_format
+from tools.prefetch import Prefetcher
 from tools.stock_tool import get_stock_price
 from tools.weather_tool import get_weather
 
@@ -32,50 +36,56 @@ Always be clear about the reasoning behind your predictions. If it's rainy, you'
 Remember: This is a fun, educational example - not real financial advice!"""
 
 
-def create_client() -> Groq:
-    """Create a Groq client."""
-    if not GROQ_API_KEY:
-        raise ValueError(
-            "GROQ_API_KEY not set! Please add it to your .env file.\n"
-            "Get your key at: https://console.groq.com/"
-        )
-
-    return Groq(api_key=GROQ_API_KEY)
-
-
-# Global client for retry function
-_client = None
-
-
-def get_client() -> Groq:
-    """Get or create the global client."""
-    global _client
-    if _client is None:
-        _client = create_client()
-    return _client
-
-
-def call_llm_with_retry(messages, tools, max_retries=3):
+def call_llm_with_retry(messages, tools, max_retries=3, model=GROQ_MODEL, **kwargs):
     """
     Call Groq API with retry logic for rate limiting.
-    (Provided for you - handles rate limits)
+    (Provided for you - handles rate limits, within the query's deadline)
     """
     client = get_client()
+    if isinstance(messages, Session):
+        messages = messages.to_dicts()
     for i in range(max_retries):
         try:
             return client.chat.completions.create(
-                model=GROQ_MODEL,
+                model=model,
                 messages=messages,
                 tools=tools,
+                timeout=timeout_for(LLM_REQUEST_TIMEOUT),
+                **kwargs,
             )
         except groq.RateLimitError:
             wait_time = (2 ** i) + 1  # Exponential backoff: 2s, 5s, 9s...
             print(f"Rate limit hit. Retrying in {wait_time} seconds...")
-            time.sleep(wait_time)
+            backoff_sleep(wait_time)
     raise Exception("Max retries exceeded.")
 
 
-def run_agent(user_query: str, max_iterations: int = 10) -> str:
+def degraded_answer(observations: list[str]) -> str:
+    """
+    A final answer without the LLM, for when the deadline runs out mid-query.
+    (Provided for you - lists the tool results gathered so far, if any)
+    """
+    if not observations:
+        return "Sorry, I ran out of time before I could look anything up. Please try again."
+    lines = "\n".join(f"- {observation}" for observation in observations)
+    return f"I ran out of time to analyze this, but here is what I found:\n{lines}"
+
+
+def has_valid_tool_calls(response) -> bool:
+    """Check that every tool call names a real tool and has JSON object arguments."""
+    for tool_call in response.choices[0].message.tool_calls or []:
+        if tool_call.function.name not in TOOL_FUNCTIONS:
+            return False
+        try:
+            if not isinstance(json.loads(tool_call.function.arguments or "{}"), dict):
+                return False
+        except json.JSONDecodeError:
+            return False
+    return True
+
+
+@with_deadline
+def run_agent(user_query: str, max_iterations: int = 10, session: Session | None = None) -> str:
     """
     Run the ReAct agent loop.
 
@@ -88,22 +98,54 @@ def run_agent(user_query: str, max_iterations: int = 10) -> str:
     Args:
         user_query: The user's question
         max_iterations: Maximum number of tool-calling iterations (safety limit)
+        session: Continue this conversation instead of starting a new one
+            (e.g. one loaded from a `session.SessionStore`)
+        deadline: Latency budget in seconds for the whole run (added by
+            `@with_deadline`; default QUERY_DEADLINE_SECONDS, 0 for none)
 
     Returns:
         The agent's final response
     """
-    # Initialize conversation with system prompt and user query
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": user_query},
-    ]
+    # Start fetching the tickers/cities named in the query right away, so the
+    # tool latency overlaps with the first LLM call instead of following it
+    prefetcher = Prefetcher().start(user_query)
+    if prefetcher.pending:
+        print(f"Prefetching: {', '.join(f'{tool}({arg})' for tool, arg in prefetcher.pending)}")
+
+    # Initialize conversation with system prompt and user query. A Session
+    # works like a list of message dicts but stores them compactly.
+    messages = session if session is not None else Session([{"role": "system", "content": SYSTEM_PROMPT}])
+    messages.append({"role": "user", "content": user_query})
+    # Picking the first tools is a fast-model job; once tool results are in,
+    # the next turn usually is the answer, so it goes to the synthesis model
+    phase = "tools"
+    # Every tool result so far, in case the deadline leaves no time for the LLM
+    gathered = []
 
     for iteration in range(max_iterations):
         print(f"\n--- Iteration {iteration + 1} ---")
 
-        # Call the LLM (with retry for rate limiting)
-        response = call_llm_with_retry(messages, TOOLS)
-
+        # Almost out of time: no more tools, answer with what we have so far
+        forced_answer = budget_low()
+        try:
+            if forced_answer:
+                print("  (deadline close - asking for the final answer now)")
+                response = cascade(
+                    "synthesis",
+                    lambda model: call_llm_with_retry(messages, TOOLS, model=model, tool_choice="none"),
+                )
+            else:
+                # Call the LLM (with retry for rate limiting). Tools stay available in
+                # every phase; invalid tool calls are retried on the larger model.
+                response = cascade(
+                    phase,
+                    lambda model: call_llm_with_retry(messages, TOOLS, model=model),
+                    validate=has_valid_tool_calls,
+                )
+        except (DeadlineExceeded, groq.APITimeoutError) as e:
+            # No time left to wait out a rate limit or a slow model: answer anyway
+            print(f"  (out of time - {e}; answering without the LLM)")
+            return degraded_answer(gathered)
         msg = response.choices[0].message
         print(f"Assistant: {msg.content or '(calling tools...)'}")
 
@@ -133,12 +175,20 @@ def run_agent(user_query: str, max_iterations: int = 10) -> str:
         # ============================================================
 
         # Process each tool call
+        observations = []
         for tool_call in msg.tool_calls:
             fn_name = tool_call.function.name
             fn_args = json.loads(tool_call.function.arguments)
 
             print(f"  Tool call: {fn_name}({fn_args})")
 
+            # Use the speculative result if we already started this call. The
+            # forecast and backtest tools are run here too (call_tool checks
+            # their arguments), so the branches below only cover the basics.
+            ready = prefetcher.take(fn_name, fn_args)
+            if ready is None and fn_name in ("get_forecast", "backtest_rain_effect"):
+                ready = call_tool(fn_name, fn_args)
+
             # ============================================================
             # TODO Exercise C: Handle Tool Hallucinations
             # ============================================================
@@ -150,7 +200,9 @@ def run_agent(user_query: str, max_iterations: int = 10) -> str:
             # Fix it by returning an error message for unknown tools.
             #
             # YOUR CODE HERE (fix the else branch):
-            if fn_name == "get_stock_price":
+            if ready is not None:
+                observation = ready
+            elif fn_name == "get_stock_price":
                 observation = get_stock_price(fn_args.get("ticker", "AAPL"))
             elif fn_name == "get_weather":
                 observation = get_weather(fn_args.get("city", "New York"))
@@ -162,12 +214,16 @@ def run_agent(user_query: str, max_iterations: int = 10) -> str:
             # ============================================================
 
             print(f"  Result: {observation}")
+            observations.append((tool_call.id, observation))
+            gathered.append(observation)
 
-            # Add the tool result to messages
+        # Add the tool results to messages (as one compact table if the model reads those)
+        phase = "synthesis"
+        for tool_call_id, content in encode_observations(observations, observation_format(model_for(phase))):
             messages.append({
                 "role": "tool",
-                "tool_call_id": tool_call.id,
-                "content": observation,
+                "tool_call_id": tool_call_id,
+                "content": content,
             })
 
     # ============================================================
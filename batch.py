@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Batch runner - replay many queries across a pool of worker processes.
+
+Queries are split into shards and each shard runs in its own process, so the
+GIL-bound work (JSON decoding, formatting, message building) scales with
+cores. Workers share the on-disk cache in CACHE_DIR: writes are atomic
+renames and a per-key lock makes sure only one worker fetches a given
+ticker/city. Answers, timings and model/planner stats come back to the
+parent and are merged there.
+
+Usage:
+    python batch.py queries.txt --workers 8
+    python batch.py queries.txt --planning --output results.jsonl
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from assignments.fast_planner import PLANNER_STATS
+from model_router import MODEL_STATS, percentile
+
+# Shards per worker - more shards balance uneven query costs better
+SHARDS_PER_WORKER = 4
+
+
+def _run_shard(shard: list[tuple[int, str]], use_planning: bool, quiet: bool) -> dict:
+    """Run one shard of (index, query) pairs inside a worker process."""
+    if use_planning:
+        from assignments.planning_agent import run_planning_agent as run_agent
+    else:
+        from assignments.react_agent import run_agent
+
+    # Stats are per-process globals; start clean so the parent can just add them up
+    MODEL_STATS.reset()
+    PLANNER_STATS.reset()
+
+    results = []
+    for index, query in shard:
+        start = time.perf_counter()
+        answer, error = None, None
+        try:
+            # The agents narrate every step - keep worker output readable
+            with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+                answer = run_agent(query)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append({
+            "index": index,
+            "query": query,
+            "answer": answer,
+            "error": error,
+            "elapsed": time.perf_counter() - start,
+            "pid": os.getpid(),
+        })
+
+    return {
+        "results": results,
+        "model_stats": MODEL_STATS.snapshot(),
+        "planner_stats": PLANNER_STATS.snapshot(),
+    }
+
+
+def run_batch(queries: list[str], use_planning: bool = False, workers: int | None = None, quiet: bool = True) -> list[dict]:
+    """
+    Run queries across a pool of worker processes.
+
+    Args:
+        queries: The user queries to run
+        use_planning: Use the planning agent instead of ReAct
+        workers: Number of worker processes (default: CPU count)
+        quiet: Suppress the agents' step-by-step output in workers
+
+    Returns:
+        One result dict per query, in input order, with "answer", "error",
+        "elapsed" (seconds) and "pid". Model and planner stats from every
+        worker are merged into MODEL_STATS / PLANNER_STATS.
+    """
+    workers = workers or os.cpu_count() or 1
+    indexed = list(enumerate(queries))
+    n_shards = min(len(indexed), workers * SHARDS_PER_WORKER) or 1
+    shards = [indexed[i::n_shards] for i in range(n_shards)]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_shard, shard, use_planning, quiet) for shard in shards if shard]
+        for future in futures:
+            shard_result = future.result()
+            results.extend(shard_result["results"])
+            MODEL_STATS.merge(shard_result["model_stats"])
+            PLANNER_STATS.merge(shard_result["planner_stats"])
+
+    results.sort(key=lambda r: r["index"])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("queries", help="file with one query per line")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--planning", action="store_true", help="use the planning agent instead of ReAct")
+    parser.add_argument("--output", help="write one JSON result per line to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the agents' step-by-step output")
+    args = parser.parse_args()
+
+    with open(args.queries) as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    start = time.perf_counter()
+    results = run_batch(queries, args.planning, args.workers, quiet=not args.verbose)
+    wall = time.perf_counter() - start
+
+    if args.output:
+        with open(args.output, "w") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+    latencies = [r["elapsed"] for r in results]
+    errors = sum(1 for r in results if r["error"])
+    print(f"{len(results)} queries in {wall:.1f}s ({len(results) / wall:.1f} queries/s) "
+          f"across {len({r['pid'] for r in results})} processes, {errors} errors")
+    print(f"Per-query latency: p50 {percentile(latencies, 50):.2f}s, p95 {percentile(latencies, 95):.2f}s")
+    print(MODEL_STATS.report())
+    if args.planning:
+        print(PLANNER_STATS.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Warm-start lookups: per-key JSON files vs the packed cache snapshot.
+
+Fills a scratch cache directory with N entries shaped like the tools' own
+(quotes, current weather, hourly forecasts), then times what a new worker
+does: look up every key once. The file backend opens and parses one file per
+key; the snapshot backend maps one file and parses only the values it
+returns. Also times a full and an incremental (1% changed) re-snapshot.
+
+Usage:
+    python -m benchmarks.cache_warm_start
+    python -m benchmarks.cache_warm_start --entries 1000 10000 50000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from mock_data import get_mock_forecast, get_mock_stock, get_mock_weather
+from tools.cache import FileCacheBackend
+from tools.cache_snapshot import CacheSnapshot, SnapshotCacheBackend, write_snapshot
+from tools.results import SOURCE_MOCK, Forecast
+
+
+def _fill(directory: Path, n: int) -> list[str]:
+    """Write n cache entries (70% quotes, 25% weather, 5% forecasts); returns their keys."""
+    backend = FileCacheBackend(directory)
+    today = date.today().isoformat()
+    forecast = Forecast.from_hourly("New York", get_mock_forecast("New York"), SOURCE_MOCK).to_cache()
+    weather = get_mock_weather("London")
+    keys = []
+    for i in range(n):
+        if i % 20 == 0:
+            key, data = f"forecast_{i}_{today}", forecast
+        elif i % 4 == 1:
+            key, data = f"weather_city_{i}_{today}", {**weather, "fetched_at": time.time()}
+        else:
+            key, data = f"stock_T{i}_{today}", {**get_mock_stock(f"T{i}"), "fetched_at": time.time()}
+        backend.set(key, data)
+        keys.append(key)
+    return keys
+
+
+def _time_lookups(backend, keys: list[str]) -> float:
+    t0 = time.perf_counter()
+    for key in keys:
+        assert backend.get(key) is not None
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[1_000, 10_000])
+    args = parser.parse_args()
+
+    print(f"{'entries':>8}  {'files':>9}  {'snapshot':>9}  {'open':>7}  {'full pack':>9}  {'incremental':>11}  {'size':>9}")
+    for n in args.entries:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            snap_path = directory / "cache.snap"
+            keys = _fill(directory, n)
+
+            t0 = time.perf_counter()
+            write_snapshot(directory, snap_path)
+            full = time.perf_counter() - t0
+
+            # Touch 1% of the entries, then re-snapshot
+            now = time.time() + 1
+            for key in keys[::100]:
+                os.utime(directory / f"{key}.json", (now, now))
+            t0 = time.perf_counter()
+            stats = write_snapshot(directory, snap_path)
+            incremental = time.perf_counter() - t0
+
+            files = _time_lookups(FileCacheBackend(directory), keys)
+            t0 = time.perf_counter()
+            snapshot = CacheSnapshot(snap_path)
+            opened = time.perf_counter() - t0
+            mapped = _time_lookups(SnapshotCacheBackend(FileCacheBackend(directory), snapshot), keys)
+            snapshot.close()
+
+            print(f"{n:>8,}  {files * 1000:>7.1f}ms  {mapped * 1000:>7.1f}ms  {opened * 1e6:>5.0f}µs  "
+                  f"{full * 1000:>7.1f}ms  {incremental * 1000:>9.1f}ms  {stats['bytes'] / 1e6:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
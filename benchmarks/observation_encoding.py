@@ -0,0 +1,144 @@
+"""
+Prompt tokens and accuracy of the "text" vs "table" observation formats.
+
+Runs a fixed set of multi-result turns (built from the mock data, so the
+numbers are stable) through both encodings and reports approximate prompt
+tokens per turn. Every table is decoded again and checked against the
+records it came from.
+
+With --llm, each turn is also sent to the model in both formats with the
+same extraction question, and the answers are scored against the records;
+prompt tokens then come from the API's own usage counts.
+
+Usage:
+    python -m benchmarks.observation_encoding
+    python -m benchmarks.observation_encoding --llm --model llama-3.1-8b-instant
+"""
+
+import argparse
+import json
+
+from mock_data import get_mock_stock, get_mock_weather
+from tools.observation_encoding import (
+    FORMAT_TABLE,
+    FORMAT_TEXT,
+    decode_table,
+    encode_observations,
+    encode_table,
+    estimate_tokens,
+)
+from tools.results import SOURCE_MOCK, StockQuote, WeatherReport
+
+# (tickers, cities) per turn - what a multi-ticker question makes the agent fetch
+TURNS = [
+    (["AAPL"], ["New York"]),
+    (["AAPL", "MSFT"], ["New York"]),
+    (["NVDA", "AMD", "INTC"], ["San Francisco"]),
+    (["GOOGL", "AMZN", "META", "TSLA"], ["Seattle"]),
+    (["JPM", "GS", "MS", "BAC", "C"], ["New York", "London"]),
+    (["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "META", "TSLA", "AVGO"], ["New York", "Tokyo", "London"]),
+]
+
+QUESTION = (
+    'From the tool results, return only JSON: {"change_pct": {ticker: number}, "rainy": {city: true/false}}'
+)
+
+
+def _records(tickers: list[str], cities: list[str]) -> list:
+    return [WeatherReport.from_observation(c, get_mock_weather(c), SOURCE_MOCK) for c in cities] + [
+        StockQuote.from_quote(t, get_mock_stock(t), SOURCE_MOCK) for t in tickers
+    ]
+
+
+def _round_trip_ok(records: list) -> bool:
+    """Check that decoding the table gives back every record's values."""
+    rows = {row.get("ticker") or row.get("city"): row for row in decode_table(encode_table(records))}
+    for r in records:
+        if isinstance(r, StockQuote):
+            row = rows[r.ticker]
+            if abs(float(row["price"]) - r.price) > 0.005 or abs(float(row["change_pct"]) - r.change_pct) > 0.005:
+                return False
+        else:
+            row = rows[r.city]
+            if row["temp_c"] != f"{r.temperature:.0f}" or (row["condition"] == "rainy") != r.is_rainy:
+                return False
+    return len(rows) == len(records)
+
+
+def _messages(records: list, fmt: str) -> list[dict]:
+    """A minimal conversation ending in this turn's tool results."""
+    calls = [(f"call_{i}", r) for i, r in enumerate(records)]
+    return [
+        {"role": "user", "content": QUESTION},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {"id": call_id, "type": "function", "function": {
+                    "name": "get_stock_price" if isinstance(r, StockQuote) else "get_weather",
+                    "arguments": json.dumps({"ticker": r.ticker} if isinstance(r, StockQuote) else {"city": r.city}),
+                }}
+                for call_id, r in calls
+            ],
+        },
+        *({"role": "tool", "tool_call_id": call_id, "content": content}
+          for call_id, content in encode_observations(calls, fmt)),
+    ]
+
+
+def _score(answer: str, records: list) -> float:
+    """Fraction of facts (change % per ticker, rain per city) the answer got right."""
+    try:
+        data = json.loads(answer[answer.index("{"):answer.rindex("}") + 1])
+    except ValueError:
+        return 0.0
+    correct = 0
+    for r in records:
+        try:
+            if isinstance(r, StockQuote):
+                correct += abs(float(data["change_pct"][r.ticker]) - r.change_pct) < 0.01
+            else:
+                correct += bool(data["rainy"][r.city]) == r.is_rainy
+        except (KeyError, TypeError, ValueError):
+            pass
+    return correct / len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", action="store_true", help="also ask the model and score its answers")
+    parser.add_argument("--model", default=None, help="model for --llm (default: GROQ_FAST_MODEL)")
+    args = parser.parse_args()
+
+    print(f"{'results':>7}  {'text tok':>8}  {'table tok':>9}  {'saving':>6}  round-trip")
+    totals = {FORMAT_TEXT: 0, FORMAT_TABLE: 0}
+    for tickers, cities in TURNS:
+        records = _records(tickers, cities)
+        calls = [(f"call_{i}", r) for i, r in enumerate(records)]
+        tokens = {fmt: sum(estimate_tokens(c) for _, c in encode_observations(calls, fmt)) for fmt in totals}
+        for fmt in totals:
+            totals[fmt] += tokens[fmt]
+        print(f"{len(records):>7}  {tokens[FORMAT_TEXT]:>8}  {tokens[FORMAT_TABLE]:>9}  "
+              f"{1 - tokens[FORMAT_TABLE] / tokens[FORMAT_TEXT]:>6.0%}  {'ok' if _round_trip_ok(records) else 'MISMATCH'}")
+    print(f"{'total':>7}  {totals[FORMAT_TEXT]:>8}  {totals[FORMAT_TABLE]:>9}  "
+          f"{1 - totals[FORMAT_TABLE] / totals[FORMAT_TEXT]:>6.0%}  (approximate tokens)")
+
+    if not args.llm:
+        return
+
+    from config import GROQ_FAST_MODEL
+    from llm_client import get_client
+
+    model = args.model or GROQ_FAST_MODEL
+    print(f"\nModel: {model}")
+    print(f"{'results':>7}  {'fmt':>5}  {'prompt tok':>10}  accuracy")
+    for tickers, cities in TURNS:
+        records = _records(tickers, cities)
+        for fmt in (FORMAT_TEXT, FORMAT_TABLE):
+            response = get_client().chat.completions.create(model=model, messages=_messages(records, fmt), temperature=0)
+            accuracy = _score(response.choices[0].message.content or "", records)
+            print(f"{len(records):>7}  {fmt:>5}  {response.usage.prompt_tokens:>10}  {accuracy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
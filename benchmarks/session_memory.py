@@ -0,0 +1,81 @@
+"""
+Memory per agent session: plain message dicts vs `session.Session`.
+
+Builds N concurrent conversations shaped like a typical ReAct run (system
+prompt, question, assistant turn with two tool calls, two tool results,
+final answer) and reports the bytes held per session, measured with
+tracemalloc, for both representations. Tool results are formatted fresh for
+every session, as the tools do, so the dict version holds one copy each.
+
+Usage:
+    python -m benchmarks.session_memory
+    python -m benchmarks.session_memory --sessions 1000 10000 50000
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from assignments.react_agent import SYSTEM_PROMPT
+from mock_data import get_mock_stock, get_mock_weather
+from session import Session
+from tools.results import SOURCE_MOCK, StockQuote, WeatherReport
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "TSLA", "META", "JPM"]
+CITIES = ["New York", "San Francisco", "London", "Tokyo", "Chicago"]
+
+
+def _conversation(i: int) -> list[dict]:
+    """One realistic conversation, as the dicts the agent appends."""
+    ticker = TICKERS[i % len(TICKERS)]
+    city = CITIES[i % len(CITIES)]
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Should I buy {ticker} today? I'm in {city}. (#{i})"},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {"id": f"call_{i}_w", "type": "function",
+                 "function": {"name": "get_weather", "arguments": json.dumps({"city": city})}},
+                {"id": f"call_{i}_s", "type": "function",
+                 "function": {"name": "get_stock_price", "arguments": json.dumps({"ticker": ticker})}},
+            ],
+        },
+        {"role": "tool", "tool_call_id": f"call_{i}_w", "content": str(WeatherReport.from_observation(city, get_mock_weather(city), SOURCE_MOCK))},
+        {"role": "tool", "tool_call_id": f"call_{i}_s", "content": str(StockQuote.from_quote(ticker, get_mock_stock(ticker), SOURCE_MOCK))},
+        {"role": "assistant", "content": f"With the weather in {city}, I'm cautious on {ticker} today (#{i})."},
+    ]
+
+
+def _measure(n: int, build) -> float:
+    """Bytes per session held by `n` sessions created with `build(i)`."""
+    # Warm caches (mock data, interned strings of earlier runs) outside the measurement
+    for i in range(len(TICKERS) * len(CITIES)):
+        build(i)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(i) for i in range(n)]
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return held / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1_000, 10_000])
+    args = parser.parse_args()
+
+    print(f"{'sessions':>10}  {'dicts B/session':>16}  {'Session B/session':>18}  {'saving':>7}")
+    for n in args.sessions:
+        plain = _measure(n, _conversation)
+        compact = _measure(n, lambda i: Session(_conversation(i)))
+        print(f"{n:>10,}  {plain:>16,.0f}  {compact:>18,.0f}  {1 - compact / plain:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,8 +15,11 @@ Run: python bonus/pydantic_ai_version.py
 """
 
 from pydantic_ai import Agent
+from pydantic_ai.models.groq import GroqModel
+from pydantic_ai.providers.groq import GroqProvider
 
 from config import GROQ_API_KEY, GROQ_MODEL
+from llm_client import get_async_client
 from tools.stock_tool import get_stock_price
 from tools.weather_tool import get_weather
 
@@ -24,9 +27,9 @@ from tools.weather_tool import get_weather
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY not set! Add it to your .env file.")
 
-# Create the agent with system prompt
+# Create the agent with system prompt, reusing the project's pooled Groq client
 agent = Agent(
-    f"groq:{GROQ_MODEL}",
+    GroqModel(GROQ_MODEL, provider=GroqProvider(groq_client=get_async_client())),
     system_prompt="""You are a financial analyst with an unusual theory:
 you believe rainy weather correlates with lower stock performance.
 
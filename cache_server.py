@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Shared cache server so a fleet of agent hosts reuses each other's fetches.
+
+A small in-memory key/value store with TTLs, spoken to over a compact binary
+protocol:
+
+    request   !BIHI  op, ttl seconds, key length, value length  + key + value
+    response  !BI    status, value length                       + value
+
+Requests on a connection are answered in order, so clients can pipeline:
+write many requests, then read all the responses. MGET fetches many keys in
+one round trip. A connection that sends SUBSCRIBE receives an INVALIDATE
+frame (status 4, value = key) whenever any key is set or deleted, which
+clients use to keep a local near-cache coherent. Fetch-lock keys ("lock:...")
+are never near-cached, so their changes are not broadcast.
+
+Usage:
+    python cache_server.py --port 7379
+
+Then on every agent host:
+    CACHE_BACKEND=remote CACHE_SERVER_ADDRESS=cache-host:7379 python main.py "..."
+"""
+
+import argparse
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+# Operations
+OP_GET = 1
+OP_SET = 2
+OP_DELETE = 3
+OP_MGET = 4
+OP_ADD = 5  # set only if absent - used for fleet-wide fetch locks
+OP_SUBSCRIBE = 6
+OP_PING = 7
+OP_DELETE_IF = 8  # delete only if the value matches - a lock is released by its holder only
+
+# Response statuses
+STATUS_OK = 0
+STATUS_MISS = 1
+STATUS_ERROR = 2
+STATUS_NOT_STORED = 3
+STATUS_INVALIDATE = 4
+
+REQUEST_HEADER = struct.Struct("!BIHI")
+RESPONSE_HEADER = struct.Struct("!BI")
+LENGTH = struct.Struct("!I")
+KEY_LENGTH = struct.Struct("!H")
+MISSING = 0xFFFFFFFF
+
+# Sweep expired keys after this many writes
+SWEEP_EVERY = 1024
+
+# Keys of fleet-wide fetch locks (see RemoteCacheBackend.lock)
+LOCK_KEY_PREFIX = b"lock:"
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def encode_request(op: int, key: bytes = b"", value: bytes = b"", ttl: int = 0) -> bytes:
+    return REQUEST_HEADER.pack(op, ttl, len(key), len(value)) + key + value
+
+
+def encode_keys(keys: list[bytes]) -> bytes:
+    """MGET payload: each key prefixed with its 2-byte length."""
+    return b"".join(KEY_LENGTH.pack(len(k)) + k for k in keys)
+
+
+def decode_values(payload: bytes) -> list[bytes | None]:
+    """MGET response: each value prefixed with its 4-byte length (MISSING for absent keys)."""
+    values, offset = [], 0
+    while offset < len(payload):
+        (length,) = LENGTH.unpack_from(payload, offset)
+        offset += LENGTH.size
+        if length == MISSING:
+            values.append(None)
+        else:
+            values.append(payload[offset:offset + length])
+            offset += length
+    return values
+
+
+class CacheStore:
+    """Thread-safe TTL dict that notifies subscribers of changes."""
+
+    def __init__(self):
+        self._data: dict[bytes, tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._subscribers: list["CacheRequestHandler"] = []
+
+    def get(self, key: bytes) -> bytes | None:
+        with self._lock:
+            return self._get(key, time.monotonic())
+
+    def _get(self, key: bytes, now: float) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires and expires <= now:
+            del self._data[key]
+            return None
+        return value
+
+    def get_many(self, keys: list[bytes]) -> list[bytes | None]:
+        now = time.monotonic()
+        with self._lock:
+            return [self._get(k, now) for k in keys]
+
+    def set(self, key: bytes, value: bytes, ttl: int, only_if_absent: bool = False) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if only_if_absent and self._get(key, now) is not None:
+                return False
+            self._data[key] = (now + ttl if ttl else 0.0, value)
+            self._writes += 1
+            if self._writes % SWEEP_EVERY == 0:
+                self._sweep(now)
+        self._notify(key)
+        return True
+
+    def delete(self, key: bytes) -> bool:
+        with self._lock:
+            existed = self._data.pop(key, None) is not None
+        if existed:
+            self._notify(key)
+        return existed
+
+    def delete_if(self, key: bytes, value: bytes) -> bool:
+        """Delete `key` only if it currently holds `value` (compare-and-delete)."""
+        with self._lock:
+            existed = self._get(key, time.monotonic()) == value
+            if existed:
+                del self._data[key]
+        if existed:
+            self._notify(key)
+        return existed
+
+    def _sweep(self, now: float) -> None:
+        expired = [k for k, (expires, _) in self._data.items() if expires and expires <= now]
+        for key in expired:
+            del self._data[key]
+
+    def subscribe(self, handler: "CacheRequestHandler") -> None:
+        with self._lock:
+            self._subscribers.append(handler)
+
+    def unsubscribe(self, handler: "CacheRequestHandler") -> None:
+        with self._lock:
+            if handler in self._subscribers:
+                self._subscribers.remove(handler)
+
+    def _notify(self, key: bytes) -> None:
+        if key.startswith(LOCK_KEY_PREFIX):
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        frame = RESPONSE_HEADER.pack(STATUS_INVALIDATE, len(key)) + key
+        for handler in subscribers:
+            handler.push(frame)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheRequestHandler(socketserver.BaseRequestHandler):
+    """Serves one client connection until it closes."""
+
+    server: "CacheServer"
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._send_lock = threading.Lock()
+
+    def push(self, frame: bytes) -> None:
+        try:
+            with self._send_lock:
+                self.request.sendall(frame)
+        except OSError:
+            self.server.store.unsubscribe(self)
+
+    def handle(self):
+        store = self.server.store
+        try:
+            while True:
+                op, ttl, key_len, value_len = REQUEST_HEADER.unpack(_recv_exact(self.request, REQUEST_HEADER.size))
+                key = _recv_exact(self.request, key_len) if key_len else b""
+                value = _recv_exact(self.request, value_len) if value_len else b""
+                status, payload = self._dispatch(store, op, key, value, ttl)
+                if op == OP_SUBSCRIBE:
+                    store.subscribe(self)
+                self.push(RESPONSE_HEADER.pack(status, len(payload)) + payload)
+        except (ConnectionError, OSError, struct.error):
+            pass
+        finally:
+            store.unsubscribe(self)
+
+    @staticmethod
+    def _dispatch(store: CacheStore, op: int, key: bytes, value: bytes, ttl: int) -> tuple[int, bytes]:
+        if op == OP_GET:
+            found = store.get(key)
+            return (STATUS_MISS, b"") if found is None else (STATUS_OK, found)
+        if op == OP_SET:
+            store.set(key, value, ttl)
+            return STATUS_OK, b""
+        if op == OP_ADD:
+            stored = store.set(key, value, ttl, only_if_absent=True)
+            return (STATUS_OK if stored else STATUS_NOT_STORED), b""
+        if op == OP_DELETE:
+            return (STATUS_OK if store.delete(key) else STATUS_MISS), b""
+        if op == OP_DELETE_IF:
+            return (STATUS_OK if store.delete_if(key, value) else STATUS_MISS), b""
+        if op == OP_MGET:
+            keys, offset = [], 0
+            while offset < len(value):
+                (length,) = KEY_LENGTH.unpack_from(value, offset)
+                offset += KEY_LENGTH.size
+                keys.append(value[offset:offset + length])
+                offset += length
+            payload = b"".join(
+                LENGTH.pack(MISSING) if v is None else LENGTH.pack(len(v)) + v
+                for v in store.get_many(keys)
+            )
+            return STATUS_OK, payload
+        if op in (OP_SUBSCRIBE, OP_PING):
+            return STATUS_OK, b""
+        return STATUS_ERROR, f"unknown op {op}".encode()
+
+
+class CacheServer(socketserver.ThreadingTCPServer):
+    """Threaded cache server; `start()` runs it in the background (e.g. for tests)."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), CacheRequestHandler)
+        self.store = CacheStore()
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "CacheServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+
+class CacheClient:
+    """
+    Blocking client for the cache server.
+
+    One connection, shared by threads under a lock. `pipeline()` sends a batch
+    of requests in one write and then reads all the responses.
+    """
+
+    def __init__(self, address: str, timeout: float = 2.0):
+        host, _, port = address.rpartition(":")
+        self.host = host or "127.0.0.1"
+        self.port = int(port)
+        self.timeout = timeout
+        self._sock = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    @staticmethod
+    def _read_response(sock: socket.socket) -> tuple[int, bytes]:
+        status, length = RESPONSE_HEADER.unpack(_recv_exact(sock, RESPONSE_HEADER.size))
+        return status, _recv_exact(sock, length) if length else b""
+
+    def pipeline(self, frames: list[bytes]) -> list[tuple[int, bytes]]:
+        """Send encoded requests in one write and return their (status, value) responses in order."""
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._sock = self._connect()
+                self._sock.sendall(b"".join(frames))
+                return [self._read_response(self._sock) for _ in frames]
+            except (OSError, struct.error):
+                # Drop the connection so the next call reconnects from a clean state
+                self._disconnect()
+                raise
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+    def get(self, key: bytes) -> bytes | None:
+        status, value = self.pipeline([encode_request(OP_GET, key)])[0]
+        return value if status == STATUS_OK else None
+
+    def get_many(self, keys: list[bytes]) -> list[bytes | None]:
+        if not keys:
+            return []
+        _, payload = self.pipeline([encode_request(OP_MGET, value=encode_keys(keys))])[0]
+        return decode_values(payload)
+
+    def set(self, key: bytes, value: bytes, ttl: int = 0) -> None:
+        self.pipeline([encode_request(OP_SET, key, value, ttl)])
+
+    def add(self, key: bytes, value: bytes, ttl: int = 0) -> bool:
+        status, _ = self.pipeline([encode_request(OP_ADD, key, value, ttl)])[0]
+        return status == STATUS_OK
+
+    def delete(self, key: bytes) -> None:
+        self.pipeline([encode_request(OP_DELETE, key)])
+
+    def delete_if(self, key: bytes, value: bytes) -> bool:
+        """Delete `key` only if it still holds `value`; True if it was deleted."""
+        status, _ = self.pipeline([encode_request(OP_DELETE_IF, key, value)])[0]
+        return status == STATUS_OK
+
+    def subscribe(self, on_invalidate, on_subscribed=None) -> threading.Thread:
+        """
+        Open a dedicated connection and call `on_invalidate(key)` for every change.
+
+        Runs in a daemon thread. `on_subscribed()` is called once the server
+        has acknowledged the subscription - no change after that point is
+        missed. If the connection drops, `on_invalidate(None)` is called once
+        so the caller can drop everything it holds.
+        """
+        def listen():
+            nonlocal on_subscribed
+            try:
+                sock = self._connect()
+                sock.settimeout(None)
+                sock.sendall(encode_request(OP_SUBSCRIBE))
+                while True:
+                    status, value = self._read_response(sock)
+                    if status == STATUS_INVALIDATE:
+                        on_invalidate(value)
+                    elif on_subscribed is not None:
+                        # The ack (invalidations may arrive before it)
+                        on_subscribed()
+                        on_subscribed = None
+            except (OSError, struct.error):
+                on_invalidate(None)
+
+        thread = threading.Thread(target=listen, daemon=True, name="cache-invalidation")
+        thread.start()
+        return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=7379)
+    args = parser.parse_args()
+
+    server = CacheServer(args.host, args.port)
+    print(f"Cache server listening on {server.address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,20 +18,98 @@ FMP_API_KEY = os.getenv("FMP_API_KEY")
 # - llama-3.3-70b-versatile (smartest, but lowest rate limits)
 GROQ_MODEL = os.getenv("GROQ_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
 
+# LLM connection pool shared by all agents (see llm_client.py)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "256"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+
+# Model cascade: tool selection and planning run on a small fast model,
+# the final answer on the larger one (see model_router.py).
+# Set MODEL_CASCADE_ENABLED=false to use GROQ_MODEL for everything.
+MODEL_CASCADE_ENABLED = os.getenv("MODEL_CASCADE_ENABLED", "true").lower() in ("1", "true", "yes")
+GROQ_FAST_MODEL = os.getenv("GROQ_FAST_MODEL", "llama-3.1-8b-instant")
+GROQ_SYNTHESIS_MODEL = os.getenv("GROQ_SYNTHESIS_MODEL", GROQ_MODEL)
+
+# Planning agent: build simple plans locally instead of asking the LLM.
+# The shadow rate is the fraction of fast-path queries that also run the LLM
+# planner, purely to measure how often the two agree.
+FAST_PLANNER_ENABLED = os.getenv("FAST_PLANNER_ENABLED", "true").lower() in ("1", "true", "yes")
+FAST_PLANNER_SHADOW_RATE = float(os.getenv("FAST_PLANNER_SHADOW_RATE", "0"))
+
+# How tool results are shown to the LLM: "text" (one sentence per result) or
+# "table" (one compact CSV block per turn, see tools/observation_encoding.py).
+# OBSERVATION_FORMATS overrides it per model, e.g.
+# "llama-3.3-70b-versatile=table,llama-3.1-8b-instant=text".
+OBSERVATION_FORMAT = os.getenv("OBSERVATION_FORMAT", "text").lower()
+OBSERVATION_FORMATS = {
+    model.strip(): fmt.strip().lower()
+    for model, _, fmt in (item.partition("=") for item in os.getenv("OBSERVATION_FORMATS", "").split(","))
+    if fmt.strip()
+}
+
+# Upstream API base URLs (override to point the tools at `mock_server.py`)
+FMP_BASE_URL = os.getenv("FMP_BASE_URL", "https://financialmodelingprep.com").rstrip("/")
+OPEN_METEO_BASE_URL = os.getenv("OPEN_METEO_BASE_URL", "https://api.open-meteo.com").rstrip("/")
+
+# Per-query latency budget (see deadline.py): seconds for one agent run,
+# 0 for none. With less than DEADLINE_RESERVE_SECONDS left, tools answer from
+# older cache entries or mock data and the agent writes its final answer.
+QUERY_DEADLINE_SECONDS = float(os.getenv("QUERY_DEADLINE_SECONDS", "30"))
+DEADLINE_RESERVE_SECONDS = float(os.getenv("DEADLINE_RESERVE_SECONDS", "5"))
+
+# Upstream HTTP calls (see tools/upstream.py): timeout per request, and a
+# hedged duplicate request once a call has run past the upstream's recent
+# HEDGE_PERCENTILE latency (after HEDGE_MIN_SAMPLES calls).
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
 # Mock mode detection
 # - Groq: Required for the agent to work
 # - FMP: Optional, falls back to mock data if missing
 USE_MOCK_STOCK = not FMP_API_KEY
 USE_MOCK_WEATHER = False  # Open-Meteo is free, no API key needed
 
+# Seed for the synthetic mock data generator (same seed -> same quotes/weather)
+MOCK_DATA_SEED = int(os.getenv("MOCK_DATA_SEED", "42"))
+
 # Default settings
 DEFAULT_CITY = "New York"
 CACHE_TTL_HOURS = 24
 
+# Days of hourly forecast fetched (and cached) per location in one request
+# (see tools/forecast_tool.py); Open-Meteo serves at most 16.
+FORECAST_DAYS = min(max(int(os.getenv("FORECAST_DAYS", "7")), 1), 16)
+
 # Cache directory
 CACHE_DIR = Path(__file__).parent / "cache"
 CACHE_DIR.mkdir(exist_ok=True)
 
+# Cache backend: "file" (JSON files in CACHE_DIR) or "remote" (shared
+# cache_server.py at CACHE_SERVER_ADDRESS, reused by every agent host)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file").lower()
+CACHE_SERVER_ADDRESS = os.getenv("CACHE_SERVER_ADDRESS", "127.0.0.1:7379")
+
+# Packed snapshot of the cache, mapped at startup when present (write it with
+# `python -m tools.cache_snapshot`, see tools/cache_snapshot.py)
+CACHE_SNAPSHOT_FILE = Path(os.getenv("CACHE_SNAPSHOT_FILE", CACHE_DIR / "cache.snap"))
+
+# Where idle agent sessions are parked (see session.py)
+SESSION_DIR = Path(os.getenv("SESSION_DIR", CACHE_DIR / "sessions"))
+
+# Columnar history of every live quote/weather fetch (see tools/history.py).
+# Needs NumPy (the "history" extra); without it nothing is recorded.
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() in ("1", "true", "yes")
+HISTORY_DIR = Path(os.getenv("HISTORY_DIR", CACHE_DIR / "history"))
+
+# Symbol universe used to validate tickers before fetching (CSV: symbol,name)
+# Point this at a full exchange listing to cover every traded symbol.
+TICKER_UNIVERSE_FILE = Path(
+    os.getenv("TICKER_UNIVERSE_FILE", Path(__file__).parent / "tools" / "data" / "tickers.csv")
+)
+
 # City coordinates for weather lookups
 CITY_COORDINATES = {
     "new york": {"lat": 40.7128, "lon": -74.0060},
@@ -42,9 +120,26 @@ CITY_COORDINATES = {
 }
 
 
+# Common abbreviations and nicknames for the cities above
+CITY_ALIASES = {
+    "nyc": "new york",
+    "new york city": "new york",
+    "manhattan": "new york",
+    "sf": "san francisco",
+    "san fran": "san francisco",
+    "ldn": "london",
+}
+
+
+def normalize_city(city: str) -> str:
+    """Normalize a city name, resolving aliases (e.g. "NYC" -> "new york")."""
+    normalized = " ".join(city.lower().split())
+    return CITY_ALIASES.get(normalized, normalized)
+
+
 def get_city_coordinates(city: str) -> tuple[float, float] | None:
     """Get latitude and longitude for a city name."""
-    normalized = city.lower().strip()
+    normalized = normalize_city(city)
     if normalized in CITY_COORDINATES:
         coords = CITY_COORDINATES[normalized]
         return coords["lat"], coords["lon"]
@@ -55,9 +150,18 @@ def print_config_status():
     """Print current configuration status for debugging."""
     print("=== Configuration Status ===")
     print(f"Groq API Key: {'✓ Set' if GROQ_API_KEY else '✗ Missing (required!)'}")
+    if MODEL_CASCADE_ENABLED:
+        print(f"Models: {GROQ_FAST_MODEL} (tools/planning) -> {GROQ_SYNTHESIS_MODEL} (synthesis)")
+    else:
+        print(f"Model: {GROQ_MODEL}")
     print(f"FMP API Key: {'✓ Set' if FMP_API_KEY else '✗ Missing (using mock data)'}")
     print(f"Mock Stock Data: {'Yes' if USE_MOCK_STOCK else 'No'}")
-    print(f"Cache Directory: {CACHE_DIR}")
+    print(f"FMP Base URL: {FMP_BASE_URL}")
+    print(f"Open-Meteo Base URL: {OPEN_METEO_BASE_URL}")
+    if CACHE_BACKEND == "remote":
+        print(f"Cache Server: {CACHE_SERVER_ADDRESS}")
+    else:
+        print(f"Cache Directory: {CACHE_DIR}")
     print("============================")
 
 
@@ -0,0 +1,145 @@
+"""
+End-to-end latency budget for one agent query.
+
+A `Deadline` is set once per query (`main.py --deadline`, `run_agent(...,
+deadline=...)` or QUERY_DEADLINE_SECONDS) and travels in a context variable,
+so everything the query calls sees the same budget without passing it
+around:
+
+- LLM calls and upstream HTTP requests cap their timeout at the time left
+- rate-limit backoff gives up rather than sleep past the deadline
+- with less than DEADLINE_RESERVE_SECONDS left (`budget_low()`), tools answer
+  from older cache entries or mock data and the agent stops calling tools
+  and writes its final answer
+
+Threads do not inherit context variables; submit work with
+`contextvars.copy_context().run` to carry the deadline along.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from config import DEADLINE_RESERVE_SECONDS, QUERY_DEADLINE_SECONDS
+
+# Shortest timeout handed out, so a call made right at the deadline still has a chance
+MIN_TIMEOUT = 0.5
+
+
+class DeadlineExceeded(TimeoutError):
+    """The query's latency budget ran out before the work could finish."""
+
+
+class Deadline:
+    """A point in (monotonic) time by which the query should be answered."""
+
+    __slots__ = ("seconds", "expires")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def __repr__(self) -> str:
+        return f"Deadline({self.seconds:g}s, {self.remaining():.2f}s left)"
+
+
+_current: ContextVar[Deadline | None] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    """The deadline of the running query, if any."""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float | None):
+    """
+    Run the block under a deadline `seconds` from now (None or <= 0: no new limit).
+
+    A scope inside another keeps the earlier of the two deadlines.
+    """
+    outer = _current.get()
+    deadline = Deadline(seconds) if seconds and seconds > 0 else None
+    if deadline is None or (outer is not None and outer.expires <= deadline.expires):
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def with_deadline(fn):
+    """
+    Decorator: run an agent entry point under a per-query deadline.
+
+    The wrapped function accepts an extra `deadline=` keyword (seconds,
+    default QUERY_DEADLINE_SECONDS; 0 for none).
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, deadline: float | None = None, **kwargs):
+        with deadline_scope(QUERY_DEADLINE_SECONDS if deadline is None else deadline):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def remaining() -> float | None:
+    """Seconds left for the running query (None without a deadline)."""
+    deadline = _current.get()
+    return None if deadline is None else deadline.remaining()
+
+
+def budget_low() -> bool:
+    """True once less than DEADLINE_RESERVE_SECONDS are left: time to degrade and answer."""
+    left = remaining()
+    return left is not None and left < DEADLINE_RESERVE_SECONDS
+
+
+def timeout_for(default: float) -> float:
+    """A per-call timeout: `default`, capped at the time left (never below MIN_TIMEOUT)."""
+    left = remaining()
+    return default if left is None else max(MIN_TIMEOUT, min(default, left))
+
+
+def check_backoff(seconds: float) -> None:
+    """
+    Make sure waiting `seconds` before a retry still fits in the budget.
+
+    Raises:
+        DeadlineExceeded: If the wait plus the reserve for the final answer
+            would run past the deadline.
+    """
+    left = remaining()
+    if left is not None and seconds + DEADLINE_RESERVE_SECONDS > left:
+        raise DeadlineExceeded(f"no time left to retry ({left:.1f}s of the budget remaining)")
+
+
+def backoff_sleep(seconds: float) -> None:
+    """Sleep before a retry, unless that would run past the deadline (see `check_backoff`)."""
+    check_backoff(seconds)
+    time.sleep(seconds)
+
+
+if __name__ == "__main__":
+    # Nested scopes keep the earlier deadline; timeouts shrink as the budget is spent
+    with deadline_scope(2.0) as outer:
+        print(outer, "timeout_for(10) =", timeout_for(10))
+        with deadline_scope(60):
+            print("inner scope:", current_deadline())
+        time.sleep(1.0)
+        print(current_deadline(), "timeout_for(10) =", round(timeout_for(10), 2), "budget_low:", budget_low())
+        try:
+            backoff_sleep(2)
+        except DeadlineExceeded as e:
+            print("backoff:", e)
+    print("outside:", current_deadline(), timeout_for(10))
@@ -0,0 +1,110 @@
+"""
+Shared Groq clients for every agent in the project.
+
+One sync `Groq` and one `AsyncGroq` client per process, each on a tuned
+connection pool with keep-alive, so repeated calls reuse TCP/TLS connections
+instead of reconnecting. The async client lets a single process keep
+hundreds of requests in flight without a thread per request:
+
+    results = await asyncio.gather(*(acall_llm(m, model) for m in batches))
+"""
+
+import asyncio
+
+import groq
+import httpx
+from groq import AsyncGroq, Groq
+
+from config import (
+    GROQ_API_KEY,
+    LLM_CONNECT_TIMEOUT,
+    LLM_KEEPALIVE_SECONDS,
+    LLM_MAX_CONNECTIONS,
+    LLM_REQUEST_TIMEOUT,
+)
+from deadline import check_backoff, timeout_for
+
+
+def _check_api_key() -> None:
+    if not GROQ_API_KEY:
+        raise ValueError(
+            "GROQ_API_KEY not set! Please add it to your .env file.\n"
+            "Get your key at: https://console.groq.com/"
+        )
+
+
+def _pool_settings() -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+        ),
+        "timeout": httpx.Timeout(LLM_REQUEST_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+    }
+
+
+def create_client() -> Groq:
+    """
+    Create a sync Groq client on a pooled keep-alive connection pool.
+
+    The SDK's own retries are off: they would sleep and resend without
+    looking at the query's deadline. Callers retry themselves, within it.
+    """
+    _check_api_key()
+    return Groq(api_key=GROQ_API_KEY, max_retries=0, http_client=groq.DefaultHttpxClient(**_pool_settings()))
+
+
+def create_async_client() -> AsyncGroq:
+    """Create an async Groq client on a pooled keep-alive connection pool (no SDK retries, as above)."""
+    _check_api_key()
+    return AsyncGroq(
+        api_key=GROQ_API_KEY, max_retries=0, http_client=groq.DefaultAsyncHttpxClient(**_pool_settings())
+    )
+
+
+_client = None
+_async_client = None
+
+
+def get_client() -> Groq:
+    """Get or create the shared sync client."""
+    global _client
+    if _client is None:
+        _client = create_client()
+    return _client
+
+
+def get_async_client() -> AsyncGroq:
+    """Get or create the shared async client."""
+    global _async_client
+    if _async_client is None:
+        _async_client = create_async_client()
+    return _async_client
+
+
+async def acall_llm(messages, model, tools=None, max_retries=3, timeout=None, **kwargs):
+    """
+    Async chat completion with the same rate-limit backoff as the sync agents.
+
+    Args:
+        messages: Chat messages
+        model: Model name
+        tools: Optional tool definitions
+        timeout: Per-request timeout in seconds (default: LLM_REQUEST_TIMEOUT,
+            capped at the query's remaining deadline)
+    """
+    client = get_async_client()
+    if tools is not None:
+        kwargs["tools"] = tools
+    for i in range(max_retries):
+        try:
+            return await client.chat.completions.create(
+                model=model, messages=messages, timeout=timeout_for(timeout or LLM_REQUEST_TIMEOUT), **kwargs
+            )
+        except groq.RateLimitError:
+            wait_time = (2 ** i) + 1
+            check_backoff(wait_time)
+            print(f"Rate limit hit. Retrying in {wait_time} seconds...")
+            await asyncio.sleep(wait_time)
+    raise Exception("Max retries exceeded.")
@@ -8,11 +8,15 @@ Usage:
     python main.py "What's the outlook for AAPL?"
     python main.py "Check MSFT and the weather in New York"
     python main.py --planning "What's the outlook for NVDA in NYC?"
+    python main.py --deadline 8 "Should I buy TSLA today?"
 """
 
 import sys
 
-from config import print_config_status
+from config import QUERY_DEADLINE_SECONDS, print_config_status
+from deadline import DeadlineExceeded
+from model_router import MODEL_STATS
+from tools.upstream import upstream_report
 
 
 def main():
@@ -26,6 +30,7 @@ def main():
         print('  python main.py --planning "What\'s the outlook for NVDA in NYC?"')
         print("\nFlags:")
         print("  --planning    Use the planning agent instead of ReAct")
+        print(f"  --deadline S  Latency budget for the query in seconds (default {QUERY_DEADLINE_SECONDS:g}, 0 = none)")
         return
 
     # Check for --planning flag
@@ -33,6 +38,17 @@ def main():
     if use_planning:
         args = [a for a in args if a != "--planning"]
 
+    # Check for --deadline SECONDS
+    deadline = None
+    if "--deadline" in args:
+        i = args.index("--deadline")
+        try:
+            deadline = float(args[i + 1])
+        except (IndexError, ValueError):
+            print("--deadline needs a number of seconds")
+            return
+        args = args[:i] + args[i + 2:]
+
     query = " ".join(args)
 
     # Print config status
@@ -52,9 +68,18 @@ def main():
     print("=" * 50)
 
     try:
-        response = run_agent(query)
+        response = run_agent(query, deadline=deadline)
         print("\n" + "=" * 50)
         print(f"Final Answer:\n{response}")
+        print(f"\n{MODEL_STATS.report()}")
+        if upstream_report():
+            print(upstream_report())
+        if use_planning:
+            from assignments.fast_planner import PLANNER_STATS
+            print(PLANNER_STATS.report())
+    except DeadlineExceeded as e:
+        print(f"\n❌ Deadline exceeded: {e}")
+        print("Raise the budget with --deadline or QUERY_DEADLINE_SECONDS.")
     except ValueError as e:
         print(f"\n❌ Error: {e}")
         print("\nMake sure you've set up your .env file with the required API keys.")
@@ -1,4 +1,12 @@
-"""Mock data for offline/demo mode when API keys are not available."""
+"""Mock data for offline/demo mode when API keys are not available.
+
+The hand-written tables below pin the demo tickers and cities to fixed values
+(so the workshop story - rainy New York - stays the same). Everything else is
+produced by the seeded generators in `synthetic_data.py`.
+"""
+
+from config import get_city_coordinates
+from synthetic_data import get_synthetic_market, get_synthetic_weather
 
 # Mock stock data - realistic responses for common tickers
 MOCK_STOCK_DATA = {
@@ -74,16 +82,6 @@ MOCK_STOCK_DATA = {
     },
 }
 
-# Default mock response for unknown tickers
-DEFAULT_MOCK_STOCK = {
-    "price": 100.00,
-    "changesPercentage": -0.50,
-    "change": -0.50,
-    "dayLow": 98.50,
-    "dayHigh": 101.25,
-    "volume": 1000000,
-}
-
 # Mock weather data for cities
 MOCK_WEATHER_DATA = {
     "new york": {
@@ -113,25 +111,14 @@ MOCK_WEATHER_DATA = {
     },
 }
 
-# Default mock weather for unknown cities
-DEFAULT_MOCK_WEATHER = {
-    "temperature": 20,
-    "weather_code": 2,  # Partly cloudy
-    "condition": "partly cloudy",
-}
-
 
 def get_mock_stock(ticker: str) -> dict:
     """Get mock stock data for a ticker."""
     ticker_upper = ticker.upper()
     if ticker_upper in MOCK_STOCK_DATA:
         return MOCK_STOCK_DATA[ticker_upper]
-    # Return default with the requested ticker
-    return {
-        "symbol": ticker_upper,
-        "name": f"{ticker_upper} Inc.",
-        **DEFAULT_MOCK_STOCK,
-    }
+    # Generate a deterministic quote for any other ticker
+    return get_synthetic_market().quote(ticker_upper)
 
 
 def get_mock_weather(city: str) -> dict:
@@ -139,4 +126,18 @@ def get_mock_weather(city: str) -> dict:
     city_lower = city.lower().strip()
     if city_lower in MOCK_WEATHER_DATA:
         return MOCK_WEATHER_DATA[city_lower]
-    return {"city": city, **DEFAULT_MOCK_WEATHER}
+
+    # Generate weather from coordinates when we have them, otherwise from the name
+    weather = get_synthetic_weather()
+    coords = get_city_coordinates(city)
+    data = weather.observe(*coords) if coords else weather.observe_named(city)
+    return {"city": city, **data}
+
+
+def get_mock_forecast(city: str, days: int = 7) -> dict:
+    """Get a mock hourly forecast (Open-Meteo "hourly" block) for a city, starting today."""
+    weather = get_synthetic_weather()
+    coords = get_city_coordinates(city)
+    if coords:
+        return weather.hourly(*coords, days=days)
+    return weather.hourly(*weather.named_location(city), days=days)
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the FMP and Open-Meteo HTTP APIs.
+
+Serves the endpoints the tools call (`/stable/quote` and `/v1/forecast`)
+with data from `synthetic_data.py`, and can inject latency, server errors,
+429 rate limits and slow bodies so the real HTTP code paths can be exercised
+offline.
+
+Usage:
+    python mock_server.py --port 8765 --latency lognormal:80,0.6 --error-rate 0.02 --rate-limit-rate 0.05
+
+Then point the tools at it (any non-empty FMP key turns off mock mode):
+    FMP_API_KEY=test FMP_BASE_URL=http://127.0.0.1:8765 \\
+    OPEN_METEO_BASE_URL=http://127.0.0.1:8765 python main.py "How is NVDA in London?"
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from synthetic_data import get_synthetic_market, get_synthetic_weather
+from tools.ticker_index import get_ticker_index, normalize_symbol
+
+# Open-Meteo variables we know how to fill in, mapped to their units
+CURRENT_VARIABLES = {"temperature_2m": "°C", "weather_code": "wmo code"}
+HOURLY_VARIABLES = {"temperature_2m": "°C", "precipitation_probability": "%", "weather_code": "wmo code"}
+MAX_FORECAST_DAYS = 16
+
+
+def parse_latency(spec: str):
+    """
+    Parse a latency distribution spec into a sampler returning seconds.
+
+    Specs (all values in milliseconds):
+        "0" or "fixed:50"         constant
+        "uniform:20,200"          uniform between the bounds
+        "normal:100,30"           mean, standard deviation (clamped at 0)
+        "lognormal:80,0.6"        median, sigma of the underlying normal
+    """
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    values = [float(v) for v in args.split(",")]
+
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal":
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Unknown latency distribution: {kind!r}")
+
+
+class FaultProfile:
+    """How badly the mock server should behave."""
+
+    def __init__(
+        self,
+        latency: str = "0",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        slow_body_rate: float = 0.0,
+        slow_body_seconds: float = 2.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.slow_body_rate = slow_body_rate
+        self.slow_body_seconds = slow_body_seconds
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> tuple[float, str | None, bool]:
+        """Pick latency, fault ("error", "rate_limit" or None) and slow-body flag for one request."""
+        with self._lock:
+            delay = self.sample_latency(self._rng)
+            roll = self._rng.random()
+            slow = self._rng.random() < self.slow_body_rate
+        if roll < self.rate_limit_rate:
+            return delay, "rate_limit", slow
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, "error", slow
+        return delay, None, slow
+
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    """Routes requests to the FMP and Open-Meteo stand-ins."""
+
+    server: "MockApiServer"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        routes = {
+            "/stable/quote": self._quote,
+            "/v1/forecast": self._forecast,
+        }
+        handler = routes.get(url.path)
+        if handler is None:
+            return self._send(404, {"error": True, "reason": f"Unknown endpoint {url.path}"})
+
+        delay, fault, slow = self.server.profile.draw()
+        if delay:
+            time.sleep(delay)
+        if fault == "rate_limit":
+            retry_after = str(self.server.profile.retry_after)
+            return self._send(429, {"error": True, "reason": "Too many requests"}, {"Retry-After": retry_after})
+        if fault == "error":
+            return self._send(500, {"error": True, "reason": "Injected server error"})
+
+        status, body = handler(params)
+        self._send(status, body, slow=slow)
+
+    def _quote(self, params: dict) -> tuple[int, object]:
+        """FMP /stable/quote - `symbol` may be a comma-separated list."""
+        if not params.get("apikey"):
+            return 401, {"Error Message": "Invalid API KEY. Please retry or visit our documentation."}
+
+        index = get_ticker_index()
+        market = get_synthetic_market()
+        quotes = []
+        for raw in params.get("symbol", "").split(","):
+            symbol = normalize_symbol(raw)
+            if symbol and symbol in index:
+                quote = market.quote(symbol)
+                quote["name"] = index.company_name(symbol) or quote["name"]
+                quotes.append(quote)
+        return 200, quotes
+
+    def _forecast(self, params: dict) -> tuple[int, object]:
+        """Open-Meteo /v1/forecast (`current` and `hourly`) - latitude/longitude may be comma-separated lists."""
+        try:
+            lats = [float(v) for v in params["latitude"].split(",")]
+            lons = [float(v) for v in params["longitude"].split(",")]
+        except (KeyError, ValueError):
+            return 400, {"error": True, "reason": "Parameter 'latitude' and 'longitude' must be floats"}
+        if len(lats) != len(lons):
+            return 400, {"error": True, "reason": "Parameter 'latitude' and 'longitude' must have the same number of elements"}
+
+        variables = [v for v in params.get("current", "").split(",") if v in CURRENT_VARIABLES]
+        hourly = [v for v in params.get("hourly", "").split(",") if v in HOURLY_VARIABLES]
+        try:
+            forecast_days = int(params.get("forecast_days", 7))
+        except ValueError:
+            forecast_days = -1
+        if not 0 <= forecast_days <= MAX_FORECAST_DAYS:
+            return 400, {"error": True, "reason": f"Parameter 'forecast_days' must be between 0 and {MAX_FORECAST_DAYS}"}
+        weather = get_synthetic_weather()
+        now = datetime.now().replace(second=0, microsecond=0)
+        now = now.replace(minute=now.minute - now.minute % 15)
+
+        results = []
+        for lat, lon in zip(lats, lons):
+            result = {
+                "latitude": lat,
+                "longitude": lon,
+                "timezone": params.get("timezone", "GMT"),
+            }
+            if variables:
+                observed = weather.observe(lat, lon)
+                values = {"temperature_2m": observed["temperature"], "weather_code": observed["weather_code"]}
+                result["current_units"] = {"time": "iso8601", "interval": "seconds"}
+                result["current_units"].update({v: CURRENT_VARIABLES[v] for v in variables})
+                result["current"] = {"time": now.isoformat(timespec="minutes"), "interval": 900}
+                result["current"].update({v: values[v] for v in variables})
+            if hourly:
+                series = weather.hourly(lat, lon, days=forecast_days)
+                result["hourly_units"] = {"time": "iso8601", **{v: HOURLY_VARIABLES[v] for v in hourly}}
+                result["hourly"] = {"time": series["time"], **{v: series[v] for v in hourly}}
+            results.append(result)
+
+        return 200, results[0] if len(results) == 1 else results
+
+    def _send(self, status: int, body: object, headers: dict | None = None, slow: bool = False) -> None:
+        payload = json.dumps(body).encode()
+        self.server.record(status)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        if not slow:
+            self.wfile.write(payload)
+            return
+        # Dribble the body out in small chunks over slow_body_seconds
+        chunks = max(1, min(len(payload), 20))
+        size = math.ceil(len(payload) / chunks)
+        pause = self.server.profile.slow_body_seconds / chunks
+        for i in range(0, len(payload), size):
+            self.wfile.write(payload[i:i + size])
+            self.wfile.flush()
+            time.sleep(pause)
+
+
+class MockApiServer(ThreadingHTTPServer):
+    """Threaded mock API server with per-status request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, profile: FaultProfile | None = None, verbose: bool = False):
+        super().__init__((host, port), MockApiHandler)
+        self.profile = profile or FaultProfile()
+        self.verbose = verbose
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, status: int) -> None:
+        with self._stats_lock:
+            self.stats[status] += 1
+
+    def start(self) -> "MockApiServer":
+        """Serve from a background daemon thread (handy for tests and benchmarks)."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="0", help="latency distribution, e.g. lognormal:80,0.6 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--slow-body-rate", type=float, default=0.0, help="fraction of bodies sent slowly")
+    parser.add_argument("--slow-body-seconds", type=float, default=2.0, help="time to dribble out a slow body")
+    parser.add_argument("--seed", type=int, default=None, help="seed for fault injection")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    profile = FaultProfile(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        slow_body_rate=args.slow_body_rate,
+        slow_body_seconds=args.slow_body_seconds,
+        seed=args.seed,
+    )
+    server = MockApiServer(args.host, args.port, profile, verbose=args.verbose)
+    print(f"Mock FMP/Open-Meteo server on {server.url} (latency={args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Requests by status: {dict(server.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Per-phase model routing with automatic escalation.
+
+The cheap steps of an agent run ("which tools do I need?") go to a small,
+fast model; the final write-up goes to the larger model. If the small model
+produces something unusable - an invalid tool call or a malformed plan - the
+same turn is retried once on the larger model.
+
+Phases:
+    "planning"   Planning agent, Phase 1 (JSON plan)
+    "tools"      ReAct turns that pick tool calls
+    "synthesis"  The final answer
+"""
+
+import time
+from collections import defaultdict
+
+import groq
+
+from config import GROQ_FAST_MODEL, GROQ_MODEL, GROQ_SYNTHESIS_MODEL, MODEL_CASCADE_ENABLED
+
+# Phases that run on the fast model (everything else uses the synthesis model)
+FAST_PHASES = {"planning", "tools"}
+
+
+def model_for(phase: str) -> str:
+    """Pick the model for an agent phase."""
+    if not MODEL_CASCADE_ENABLED:
+        return GROQ_MODEL
+    return GROQ_FAST_MODEL if phase in FAST_PHASES else GROQ_SYNTHESIS_MODEL
+
+
+def escalation_model(phase: str) -> str | None:
+    """The model to retry a failed turn on, or None if there is nothing bigger."""
+    model = model_for(phase)
+    return GROQ_SYNTHESIS_MODEL if model != GROQ_SYNTHESIS_MODEL else None
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class ModelStats:
+    """Per-model latency and per-phase escalation counters."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.turns = defaultdict(int)
+        self.escalations = defaultdict(int)
+
+    def timed(self, model: str, call):
+        """Run `call(model)` and record how long it took."""
+        start = time.perf_counter()
+        try:
+            return call(model)
+        except Exception:
+            self.errors[model] += 1
+            raise
+        finally:
+            self.latencies[model].append(time.perf_counter() - start)
+
+    def record_turn(self, phase: str, escalated: bool) -> None:
+        self.turns[phase] += 1
+        if escalated:
+            self.escalations[phase] += 1
+
+    def escalation_rate(self, phase: str | None = None) -> float:
+        phases = [phase] if phase else list(self.turns)
+        turns = sum(self.turns[p] for p in phases)
+        return sum(self.escalations[p] for p in phases) / turns if turns else 0.0
+
+    def snapshot(self) -> dict:
+        """Plain-dict copy of the counters (picklable, for merging across processes)."""
+        return {
+            "latencies": {model: list(values) for model, values in self.latencies.items()},
+            "errors": dict(self.errors),
+            "turns": dict(self.turns),
+            "escalations": dict(self.escalations),
+        }
+
+    def merge(self, snapshot: dict) -> None:
+        """Add the counters from another process's snapshot into this one."""
+        for model, values in snapshot["latencies"].items():
+            self.latencies[model].extend(values)
+        for name in ("errors", "turns", "escalations"):
+            counters = getattr(self, name)
+            for key, value in snapshot[name].items():
+                counters[key] += value
+
+    def report(self) -> str:
+        lines = ["Model usage:"]
+        for model, values in self.latencies.items():
+            lines.append(
+                f"  {model}: {len(values)} calls, "
+                f"p50 {percentile(values, 50) * 1000:.0f} ms, p95 {percentile(values, 95) * 1000:.0f} ms, "
+                f"{self.errors[model]} errors"
+            )
+        for phase, turns in self.turns.items():
+            lines.append(
+                f"  {phase}: {self.escalations[phase]}/{turns} turns escalated "
+                f"({self.escalation_rate(phase):.0%})"
+            )
+        return "\n".join(lines)
+
+
+MODEL_STATS = ModelStats()
+
+
+def cascade(phase: str, call, validate=None):
+    """
+    Run one LLM turn for `phase`, escalating to the larger model if needed.
+
+    Args:
+        phase: "planning", "tools" or "synthesis"
+        call: Function taking a model name and returning a chat completion
+        validate: Optional check on the completion; False means escalate
+
+    Returns:
+        The chat completion from the first model that produced a usable result.
+    """
+    model = model_for(phase)
+    bigger = escalation_model(phase)
+
+    try:
+        response = MODEL_STATS.timed(model, call)
+    except groq.BadRequestError:
+        # Groq rejects malformed tool-call generations with a 400 (tool_use_failed)
+        if bigger is None:
+            raise
+        response = None
+
+    if response is not None and (validate is None or validate(response)):
+        MODEL_STATS.record_turn(phase, escalated=False)
+        return response
+    if bigger is None:
+        MODEL_STATS.record_turn(phase, escalated=False)
+        return response
+
+    print(f"  ({model} gave an unusable {phase} response - escalating to {bigger})")
+    MODEL_STATS.record_turn(phase, escalated=True)
+    return MODEL_STATS.timed(bigger, call)
@@ -0,0 +1,288 @@
+"""
+Compact conversation state for many concurrent agent sessions.
+
+A conversation is normally a list of dicts, one per message, each with its
+own copies of role names, tool names, arguments and observation strings.
+Here each message is a `__slots__` record, repeated strings (roles, tool
+names, arguments, tool observations) are interned so every session shares
+one copy, and idle sessions can be parked on disk and loaded back on demand.
+
+`Session` is a mutable sequence of message dicts, like the list the agents
+build: `append`, `extend`, `insert`, `pop`, `del messages[1:k]` and slice
+assignment all work. Indexing returns a dict whose item assignments
+(`messages[-1]["content"] = ...`) write through to the stored message;
+edits to nested values (a tool call inside `tool_calls`) do not, assign
+the whole field instead. Call `to_dicts()` for the API payload.
+
+Measure it with:
+    python -m benchmarks.session_memory
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import MutableSequence
+from pathlib import Path
+
+from config import SESSION_DIR
+
+
+def _intern(text: str | None) -> str | None:
+    # str() first: tool results may be str subclasses, which can't be interned
+    return sys.intern(str(text)) if text is not None else None
+
+
+class ToolCall:
+    """One tool call requested by the assistant."""
+
+    __slots__ = ("id", "name", "arguments")
+
+    def __init__(self, id: str, name: str, arguments: str):
+        self.id = id
+        self.name = sys.intern(name)
+        self.arguments = sys.intern(arguments or "{}")
+
+    @classmethod
+    def from_any(cls, tool_call) -> "ToolCall":
+        """Build from an API dict or an SDK tool-call object."""
+        if isinstance(tool_call, ToolCall):
+            return tool_call
+        if isinstance(tool_call, dict):
+            function = tool_call["function"]
+            return cls(tool_call["id"], function["name"], function.get("arguments"))
+        return cls(tool_call.id, tool_call.function.name, tool_call.function.arguments)
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "type": "function", "function": {"name": self.name, "arguments": self.arguments}}
+
+
+class Message:
+    """One chat message; tool observations are interned so sessions share them."""
+
+    __slots__ = ("role", "content", "tool_calls", "tool_call_id")
+
+    def __init__(self, role: str, content: str | None = None, tool_calls=None, tool_call_id: str | None = None):
+        self.role = sys.intern(role)
+        # Tool results repeat across sessions (same ticker, same day) - keep one copy
+        self.content = _intern(content) if role in ("tool", "system") else content
+        self.tool_calls = tuple(ToolCall.from_any(tc) for tc in tool_calls) if tool_calls else None
+        self.tool_call_id = tool_call_id
+
+    @classmethod
+    def from_any(cls, message) -> "Message":
+        """Build from an API dict or an SDK message object."""
+        if isinstance(message, Message):
+            return message
+        if isinstance(message, dict):
+            return cls(message["role"], message.get("content"), message.get("tool_calls"), message.get("tool_call_id"))
+        return cls(message.role, message.content, getattr(message, "tool_calls", None))
+
+    def set(self, field: str, value) -> None:
+        """
+        Set one field from its dict form (interning as in `__init__`).
+
+        Raises:
+            KeyError: If `field` is not a message field.
+        """
+        if field == "role":
+            self.role = sys.intern(value)
+        elif field == "content":
+            self.content = _intern(value) if self.role in ("tool", "system") else value
+        elif field == "tool_calls":
+            self.tool_calls = tuple(ToolCall.from_any(tc) for tc in value) if value else None
+        elif field == "tool_call_id":
+            self.tool_call_id = value
+        else:
+            raise KeyError(f"messages have no {field!r} field")
+
+    def to_dict(self) -> dict:
+        data = {"role": self.role, "content": self.content}
+        if self.tool_calls:
+            data["tool_calls"] = [tc.to_dict() for tc in self.tool_calls]
+        if self.tool_call_id is not None:
+            data["tool_call_id"] = self.tool_call_id
+        return data
+
+    def to_row(self) -> list:
+        """Compact serialized form: [role, content, [[id, name, args], ...], tool_call_id]."""
+        calls = [[tc.id, tc.name, tc.arguments] for tc in self.tool_calls] if self.tool_calls else None
+        return [self.role, self.content, calls, self.tool_call_id]
+
+    @classmethod
+    def from_row(cls, row: list) -> "Message":
+        role, content, calls, tool_call_id = row
+        tool_calls = [ToolCall(*c) for c in calls] if calls else None
+        return cls(role, content, tool_calls, tool_call_id)
+
+
+class MessageDict(dict):
+    """A message in dict form; setting or deleting a key updates the stored Message too."""
+
+    __slots__ = ("message",)
+
+    def __init__(self, message: Message):
+        super().__init__(message.to_dict())
+        self.message = message
+
+    def __setitem__(self, key, value):
+        self.message.set(key, value)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.message.set(key, "" if key == "role" else None)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key not in self:
+            return super().pop(key, *default)
+        value = self[key]
+        del self[key]
+        return value
+
+
+class Session(MutableSequence):
+    """A conversation: an id, its messages, and when it was last used."""
+
+    __slots__ = ("session_id", "messages", "last_active")
+
+    def __init__(self, messages=(), session_id: str | None = None):
+        self.session_id = session_id or os.urandom(8).hex()
+        self.messages = [Message.from_any(m) for m in messages]
+        self.last_active = time.time()
+
+    def append(self, message) -> None:
+        """Add a message (dict, Message, or SDK message object)."""
+        self.messages.append(Message.from_any(message))
+        self.last_active = time.time()
+
+    def insert(self, index: int, message) -> None:
+        self.messages.insert(index, Message.from_any(message))
+        self.last_active = time.time()
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self):
+        return (MessageDict(m) for m in self.messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [MessageDict(m) for m in self.messages[index]]
+        return MessageDict(self.messages[index])
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            self.messages[index] = [Message.from_any(m) for m in value]
+        else:
+            self.messages[index] = Message.from_any(value)
+        self.last_active = time.time()
+
+    def __delitem__(self, index) -> None:
+        del self.messages[index]
+        self.last_active = time.time()
+
+    def to_dicts(self) -> list[dict]:
+        """The conversation in chat-completions API format."""
+        return [m.to_dict() for m in self.messages]
+
+    def dumps(self) -> str:
+        return json.dumps(
+            {"id": self.session_id, "t": self.last_active, "m": [m.to_row() for m in self.messages]},
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def loads(cls, text: str) -> "Session":
+        data = json.loads(text)
+        session = cls(session_id=data["id"])
+        session.messages = [Message.from_row(row) for row in data["m"]]
+        session.last_active = data["t"]
+        return session
+
+
+class SessionStore:
+    """
+    Keeps active sessions in memory and parks idle ones on disk.
+
+    `get()` transparently loads a parked session back; `park_idle()` writes
+    every session idle for longer than `max_idle_seconds` to disk and drops
+    it from memory.
+    """
+
+    def __init__(self, directory: Path = SESSION_DIR, max_idle_seconds: float = 300):
+        self.directory = Path(directory)
+        self.max_idle_seconds = max_idle_seconds
+        self._active: dict[str, Session] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, session_id: str) -> Path:
+        return self.directory / f"{session_id}.json"
+
+    def create(self, messages=()) -> Session:
+        session = Session(messages)
+        with self._lock:
+            self._active[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Session | None:
+        with self._lock:
+            session = self._active.get(session_id)
+            if session is not None:
+                return session
+            path = self._path(session_id)
+            try:
+                session = Session.loads(path.read_text())
+            except (OSError, ValueError, KeyError):
+                return None
+            path.unlink(missing_ok=True)
+            session.last_active = time.time()
+            self._active[session_id] = session
+            return session
+
+    def park(self, session_id: str) -> None:
+        """
+        Write a session to disk (atomically) and drop it from memory.
+
+        The session stays in memory until its file is written, so `get()`
+        always finds it in one place or the other. If it is used while
+        being written, it stays active and the file is discarded.
+        """
+        with self._lock:
+            session = self._active.get(session_id)
+        if session is None:
+            return
+        last_active = session.last_active
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(session.dumps())
+        with self._lock:
+            if self._active.get(session_id) is session and session.last_active == last_active:
+                os.replace(tmp_path, self._path(session_id))
+                del self._active[session_id]
+                return
+        os.unlink(tmp_path)
+
+    def park_idle(self) -> int:
+        """Park every session idle longer than max_idle_seconds; returns how many."""
+        cutoff = time.time() - self.max_idle_seconds
+        with self._lock:
+            idle = [sid for sid, s in self._active.items() if s.last_active < cutoff]
+        for session_id in idle:
+            self.park(session_id)
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._active)
@@ -0,0 +1,513 @@
+"""
+Seeded synthetic market and weather data.
+
+Generates realistic-looking quotes for any ticker and weather for any
+coordinates without network access. Everything is derived from a seed plus
+a hash of the symbol/location, so the same inputs always produce the same
+data and there is no per-symbol state: a 100k-symbol universe costs no more
+memory than a 7-symbol one.
+
+Intraday prices follow one of a fixed bank of shared random walks
+(stored in flat `array` buffers) scaled by each symbol's volatility, which
+keeps bulk generation cheap (about 1.5 µs per quote vectorized with NumPy,
+10-15 µs in pure Python).
+Walks are built on first use, one at a time, so a single mock quote only
+pays for its own path; bulk calls build the whole bank at once, with NumPy
+when it is installed (same values either way).
+
+Run directly for a quick throughput check:
+    python synthetic_data.py
+"""
+
+import csv
+import math
+import time
+import zlib
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from config import MOCK_DATA_SEED
+
+# Regular US session: 9:30-16:00 ET, one step per minute
+MARKET_MINUTES = 390
+MARKET_OPEN_UTC_MINUTE = 13 * 60 + 30
+
+_MASK64 = (1 << 64) - 1
+_TWO_PI = 2 * math.pi
+
+# Weather codes to draw from (WMO), split by whether they count as rain
+_DRY_CODES = (0, 1, 2, 3, 45)
+_WET_CODES = (51, 53, 61, 63, 65, 80, 81, 95)
+
+
+def _mix(x: int) -> int:
+    """splitmix64 finalizer - turns any integer into well-spread 64 bits."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _unit(h: int) -> float:
+    """Map 64 hash bits to a float in (0, 1)."""
+    return ((h >> 11) + 0.5) / (1 << 53)
+
+
+def _normal(h: int) -> float:
+    """Standard normal sample from 64 hash bits (Box-Muller)."""
+    u1 = _unit(h)
+    u2 = _unit(_mix(h))
+    return math.sqrt(-2.0 * math.log(u1)) * math.cos(_TWO_PI * u2)
+
+
+def _key(seed: int, text: str) -> int:
+    return _mix((seed << 32) ^ zlib.crc32(text.encode()))
+
+
+def _mix_array(x):
+    """`_mix` over a NumPy uint64 array (wraps mod 2**64 like the masked ints)."""
+    import numpy as np
+
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _unit_array(h):
+    """`_unit` over a NumPy uint64 array."""
+    return ((h >> 11).astype("f8") + 0.5) / (1 << 53)
+
+
+def synthetic_symbols(n: int) -> list[str]:
+    """Generate `n` distinct ticker-like symbols (AAAA, AAAB, ...)."""
+    symbols = []
+    for i in range(n):
+        letters = []
+        width = 4 if i < 26 ** 4 else 5
+        for _ in range(width):
+            i, r = divmod(i, 26)
+            letters.append(chr(65 + r))
+        symbols.append("".join(reversed(letters)))
+    return symbols
+
+
+def write_universe(path: Path, n: int) -> None:
+    """Write a `symbol,name` universe CSV usable as TICKER_UNIVERSE_FILE."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["symbol", "name"])
+        for symbol in synthetic_symbols(n):
+            writer.writerow([symbol, f"{symbol} Holdings Inc."])
+
+
+def current_market_minute(now: datetime | None = None) -> int:
+    """Minutes since the open (clamped to the session) for a UTC timestamp."""
+    now = now or datetime.now(timezone.utc)
+    minute = now.hour * 60 + now.minute - MARKET_OPEN_UTC_MINUTE
+    return max(0, min(MARKET_MINUTES, minute))
+
+
+class SyntheticMarket:
+    """Deterministic quote generator for an arbitrarily large symbol universe."""
+
+    def __init__(self, seed: int = MOCK_DATA_SEED, n_paths: int = 256, steps: int = MARKET_MINUTES):
+        self.seed = seed
+        self.n_paths = n_paths
+        self.steps = steps
+        width = steps + 1
+
+        # Shared standardized random walks: path[steps] ~ N(0, 1).
+        # Running low/high are precomputed so a quote never rescans the path.
+        # Each path is filled in on first use (`_built` marks the done ones).
+        self._walk = array("d", bytes(8 * n_paths * width))
+        self._low = array("d", bytes(8 * n_paths * width))
+        self._high = array("d", bytes(8 * n_paths * width))
+        self._built = bytearray(n_paths)
+        self._all_built = False
+
+        # Cumulative U-shaped volume profile (busy open and close)
+        self._volume_curve = array("d", [0.0]) * width
+        total = 0.0
+        for t in range(1, width):
+            x = (t - 0.5) / steps
+            total += 1.0 + 12.0 * (x - 0.5) ** 2
+            self._volume_curve[t] = total
+        for t in range(width):
+            self._volume_curve[t] /= total
+
+    def _build_path(self, p: int) -> None:
+        """Fill in walk `p` (about 2 ms in pure Python)."""
+        width = self.steps + 1
+        scale = 1.0 / math.sqrt(self.steps)
+        base = p * width
+        level = low = high = 0.0
+        h = _mix(self.seed ^ (p << 20))
+        for t in range(1, width):
+            h = _mix(h)
+            level += _normal(h) * scale
+            low = min(low, level)
+            high = max(high, level)
+            self._walk[base + t] = level
+            self._low[base + t] = low
+            self._high[base + t] = high
+        self._built[p] = 1
+
+    def _build_all(self) -> None:
+        """Fill in every walk - vectorized with NumPy if available, bit-identical to `_build_path`."""
+        if self._all_built:
+            return
+        try:
+            import numpy as np
+        except ImportError:
+            for p in range(self.n_paths):
+                if not self._built[p]:
+                    self._build_path(p)
+            self._all_built = True
+            return
+
+        # Hash chains run across all paths at once; the normals use `math` so
+        # they round exactly like the scalar path
+        h = _mix_array(np.array([(self.seed ^ (p << 20)) & _MASK64 for p in range(self.n_paths)], dtype=np.uint64))
+        chain = np.empty((self.n_paths, self.steps), dtype=np.uint64)
+        for t in range(self.steps):
+            h = _mix_array(h)
+            chain[:, t] = h
+        sqrt, log, cos = math.sqrt, math.log, math.cos
+        normals = np.array([
+            sqrt(-2.0 * log(u1)) * cos(_TWO_PI * u2)
+            for u1, u2 in zip(_unit_array(chain).ravel().tolist(), _unit_array(_mix_array(chain)).ravel().tolist())
+        ]).reshape(self.n_paths, self.steps)
+        walk = np.zeros((self.n_paths, self.steps + 1))
+        walk[:, 1:] = np.cumsum(normals * (1.0 / math.sqrt(self.steps)), axis=1)
+        np.frombuffer(self._walk, dtype=np.float64)[:] = walk.ravel()
+        np.frombuffer(self._low, dtype=np.float64)[:] = np.minimum.accumulate(walk, axis=1).ravel()
+        np.frombuffer(self._high, dtype=np.float64)[:] = np.maximum.accumulate(walk, axis=1).ravel()
+        self._built[:] = b"\x01" * self.n_paths
+        self._all_built = True
+
+    def _symbol_params(self, symbol: str) -> tuple[float, float, float]:
+        """Stable per-symbol base price, daily volatility and average volume."""
+        h = _key(self.seed, symbol)
+        base_price = math.exp(math.log(5) + _unit(h) * (math.log(800) - math.log(5)))
+        h = _mix(h)
+        daily_vol = 0.008 + 0.032 * _unit(h)
+        h = _mix(h)
+        avg_volume = math.exp(math.log(2e5) + _unit(h) * (math.log(1.5e8) - math.log(2e5)))
+        return base_price, daily_vol, avg_volume
+
+    def daily_return(self, symbol: str, day: date) -> float:
+        """Close-to-close log return for `symbol` on `day`."""
+        _, daily_vol, _ = self._symbol_params(symbol)
+        h = _mix(_key(self.seed, symbol) ^ day.toordinal())
+        return daily_vol * self._walk_end(h % self.n_paths)
+
+    def daily_returns(self, symbols: list[str], days: list[date]):
+        """
+        `daily_return` for every (day, symbol) at once (needs NumPy).
+
+        Returns:
+            A float64 array of shape (len(days), len(symbols)).
+        """
+        import numpy as np
+
+        self._build_all()
+        keys = np.array([_key(self.seed, s) for s in symbols], dtype=np.uint64)
+        vols = np.array([self._symbol_params(s)[1] for s in symbols])
+        ordinals = np.array([d.toordinal() for d in days], dtype=np.uint64)
+        paths = _mix_array(ordinals[:, None] ^ keys[None, :]) % np.uint64(self.n_paths)
+        walk_ends = np.frombuffer(self._walk, dtype=np.float64)[self.steps::self.steps + 1]
+        return walk_ends[paths.astype(np.intp)] * vols
+
+    def _walk_end(self, path: int) -> float:
+        if not self._built[path]:
+            self._build_path(path)
+        return self._walk[path * (self.steps + 1) + self.steps]
+
+    def quote(self, symbol: str, day: date | None = None, minute: int | None = None) -> dict:
+        """
+        Generate an FMP-shaped quote for a symbol.
+
+        Args:
+            symbol: Ticker symbol (any string - unknown symbols are fine)
+            day: Trading day (default: today)
+            minute: Minutes since the open, 0-390 (default: now)
+
+        Returns:
+            A dict with the same keys as an FMP /stable/quote row.
+        """
+        symbol = symbol.upper()
+        day = day or date.today()
+        minute = current_market_minute() if minute is None else max(0, min(self.steps, minute))
+        price, change_pct, change, day_low, day_high, volume = self._row(symbol, day.toordinal(), minute)
+        return {
+            "symbol": symbol,
+            "name": f"{symbol} Inc.",
+            "price": round(price, 2),
+            "changesPercentage": round(change_pct, 2),
+            "change": round(change, 2),
+            "dayLow": round(day_low, 2),
+            "dayHigh": round(day_high, 2),
+            "volume": volume,
+        }
+
+    def _row(self, symbol: str, ordinal: int, minute: int) -> tuple:
+        """Raw quote fields: price, change %, change, low, high, volume."""
+        base_price, daily_vol, avg_volume = self._symbol_params(symbol)
+        key = _key(self.seed, symbol)
+        h = _mix(key ^ ordinal)
+        path = h % self.n_paths
+        if not self._built[path]:
+            self._build_path(path)
+        i = path * (self.steps + 1) + minute
+
+        # Drift the reference level slowly from month to month
+        prev_close = base_price * math.exp(0.15 * _normal(_mix(key ^ (ordinal // 21))))
+
+        price = prev_close * math.exp(daily_vol * self._walk[i])
+        return (
+            price,
+            (price / prev_close - 1) * 100,
+            price - prev_close,
+            prev_close * math.exp(daily_vol * self._low[i]),
+            prev_close * math.exp(daily_vol * self._high[i]),
+            int(avg_volume * (0.5 + _unit(_mix(h))) * self._volume_curve[minute]),
+        )
+
+    def quotes(self, symbols: list[str], day: date | None = None, minute: int | None = None) -> dict[str, array]:
+        """
+        Generate quotes for many symbols at once as columns.
+
+        Vectorized over the symbols with NumPy when it is installed (a
+        per-symbol loop otherwise); either way each row equals `quote()`.
+
+        Returns:
+            Dict of column name -> array ("price", "changesPercentage",
+            "dayLow", "dayHigh" as doubles, "volume" as int64), row-aligned
+            with `symbols`.
+        """
+        ordinal = (day or date.today()).toordinal()
+        minute = current_market_minute() if minute is None else max(0, min(self.steps, minute))
+        try:
+            import numpy as np
+        except ImportError:
+            return self._quotes_loop(symbols, ordinal, minute)
+
+        n = len(symbols)
+        # `_key` for every symbol (its masked arithmetic is uint64 wraparound)
+        crcs = np.fromiter((zlib.crc32(s.upper().encode()) for s in symbols), dtype=np.uint64, count=n)
+        keys = _mix_array(np.uint64((self.seed << 32) & _MASK64) ^ crcs)
+
+        # `math` for the transcendentals, so every value rounds exactly like `_row`
+        def apply(fn, values):
+            return np.fromiter(map(fn, values.tolist()), dtype=np.float64, count=n)
+
+        log5, log800 = math.log(5), math.log(800)
+        h = keys
+        base_prices = apply(math.exp, log5 + _unit_array(h) * (log800 - log5))
+        h = _mix_array(h)
+        daily_vols = 0.008 + 0.032 * _unit_array(h)
+        h = _mix_array(h)
+        avg_volumes = apply(math.exp, math.log(2e5) + _unit_array(h) * (math.log(1.5e8) - math.log(2e5)))
+
+        h = _mix_array(keys ^ np.uint64(ordinal))
+        paths = (h % np.uint64(self.n_paths)).astype(np.intp)
+        if n > self.n_paths:
+            self._build_all()
+        else:
+            for path in set(paths.tolist()):
+                if not self._built[path]:
+                    self._build_path(path)
+        i = paths * (self.steps + 1) + minute
+        walk = np.frombuffer(self._walk, dtype=np.float64)[i]
+        low = np.frombuffer(self._low, dtype=np.float64)[i]
+        high = np.frombuffer(self._high, dtype=np.float64)[i]
+
+        drift = _mix_array(keys ^ np.uint64(ordinal // 21))
+        u1 = apply(math.log, _unit_array(drift))
+        u2 = apply(math.cos, _TWO_PI * _unit_array(_mix_array(drift)))
+        prev_close = base_prices * apply(math.exp, 0.15 * (np.sqrt(-2.0 * u1) * u2))
+
+        prices = prev_close * apply(math.exp, daily_vols * walk)
+        volumes = avg_volumes * (0.5 + _unit_array(_mix_array(h))) * self._volume_curve[minute]
+        return {
+            "price": array("d", prices.tobytes()),
+            "changesPercentage": array("d", ((prices / prev_close - 1) * 100).tobytes()),
+            "dayLow": array("d", (prev_close * apply(math.exp, daily_vols * low)).tobytes()),
+            "dayHigh": array("d", (prev_close * apply(math.exp, daily_vols * high)).tobytes()),
+            "volume": array("q", volumes.astype(np.int64).tobytes()),
+        }
+
+    def _quotes_loop(self, symbols: list[str], ordinal: int, minute: int) -> dict[str, array]:
+        """`quotes` without NumPy: one `_row` per symbol."""
+        prices, change_pcts, lows, highs = array("d"), array("d"), array("d"), array("d")
+        volumes = array("q")
+        row = self._row
+        for symbol in symbols:
+            price, change_pct, _, low, high, volume = row(symbol.upper(), ordinal, minute)
+            prices.append(price)
+            change_pcts.append(change_pct)
+            lows.append(low)
+            highs.append(high)
+            volumes.append(volume)
+        return {
+            "price": prices,
+            "changesPercentage": change_pcts,
+            "dayLow": lows,
+            "dayHigh": highs,
+            "volume": volumes,
+        }
+
+
+class SyntheticWeather:
+    """Deterministic weather generator for arbitrary coordinates."""
+
+    def __init__(self, seed: int = MOCK_DATA_SEED, cell_degrees: float = 0.1):
+        self.seed = seed
+        self.cell_degrees = cell_degrees
+
+    def cell_id(self, lat: float, lon: float) -> int:
+        """Grid cell containing the coordinates."""
+        row = int(math.floor((lat + 90) / self.cell_degrees))
+        col = int(math.floor((lon + 180) / self.cell_degrees))
+        return row * int(round(360 / self.cell_degrees)) + col
+
+    def _cell_hash(self, lat: float, lon: float, salt: int) -> int:
+        return _mix((self.seed << 40) ^ (self.cell_id(lat, lon) << 20) ^ salt)
+
+    def rain_probability(self, lat: float, lon: float) -> float:
+        """Climatological chance of a rainy day in this cell (10-45%)."""
+        return 0.10 + 0.35 * _unit(self._cell_hash(lat, lon, 0))
+
+    def is_rainy_day(self, lat: float, lon: float, day: date) -> bool:
+        return _unit(self._cell_hash(lat, lon, day.toordinal())) < self.rain_probability(lat, lon)
+
+    def rainy_days(self, coords: list[tuple[float, float]], days: list[date]):
+        """
+        `is_rainy_day` for every (day, location) at once (needs NumPy).
+
+        Returns:
+            A bool array of shape (len(days), len(coords)).
+        """
+        import numpy as np
+
+        bases = np.array(
+            [((self.seed << 40) ^ (self.cell_id(lat, lon) << 20)) & _MASK64 for lat, lon in coords], dtype=np.uint64
+        )
+        probabilities = np.array([self.rain_probability(lat, lon) for lat, lon in coords])
+        ordinals = np.array([d.toordinal() for d in days], dtype=np.uint64)
+        return _unit_array(_mix_array(bases[None, :] ^ ordinals[:, None])) < probabilities
+
+    def rain_window(self, lat: float, lon: float, day: date) -> tuple[int, int] | None:
+        """Hours [start, end) it rains on a rainy day (2-10 hours), or None on a dry day."""
+        if not self.is_rainy_day(lat, lon, day):
+            return None
+        h = self._cell_hash(lat, lon, day.toordinal() ^ (1 << 60))
+        length = 2 + h % 9
+        start = (h >> 8) % (24 - length + 1)
+        return start, start + length
+
+    def _conditions(self, lat: float, lon: float, day: date, hour: int, window) -> tuple[float, int, int]:
+        """Temperature, weather code and precipitation probability (%) for one hour."""
+        # Colder towards the poles, seasons flipped south of the equator
+        season = math.cos(_TWO_PI * (day.timetuple().tm_yday - 200) / 365)
+        seasonal = 12.0 * season * (1 if lat >= 0 else -1) * min(1.0, abs(lat) / 45)
+        diurnal = 4.0 * math.cos(_TWO_PI * (hour - 15) / 24)
+        h = self._cell_hash(lat, lon, day.toordinal())
+        temperature = 30.0 - 0.4 * abs(lat) + seasonal + diurnal + 2.5 * _normal(_mix(h ^ hour))
+
+        noise = _mix(h ^ (hour << 8))
+        if window and window[0] <= hour < window[1]:
+            weather_code = _WET_CODES[_mix(h) % len(_WET_CODES)]
+            precipitation = 60 + noise % 36
+        elif window:
+            weather_code = 3  # overcast around the rain
+            precipitation = 20 + noise % 21
+        else:
+            weather_code = _DRY_CODES[_mix(h) % len(_DRY_CODES)]
+            precipitation = noise % 16
+        return round(temperature, 1), weather_code, precipitation
+
+    def observe(self, lat: float, lon: float, day: date | None = None, hour: int | None = None) -> dict:
+        """
+        Generate a weather observation at the given coordinates.
+
+        Returns:
+            A dict with "temperature" (°C) and "weather_code" (WMO), the same
+            shape `get_weather` caches for live data.
+        """
+        day = day or date.today()
+        hour = datetime.now().hour if hour is None else hour
+        temperature, weather_code, _ = self._conditions(lat, lon, day, hour, self.rain_window(lat, lon, day))
+        return {"temperature": temperature, "weather_code": weather_code}
+
+    def hourly(self, lat: float, lon: float, start: date | None = None, days: int = 7) -> dict:
+        """
+        Hourly series for `days` days from `start` (default: today), midnight first.
+
+        Returns:
+            Open-Meteo's "hourly" block: "time" (ISO hours) plus
+            "temperature_2m", "precipitation_probability" and "weather_code" lists.
+        """
+        start = start or date.today()
+        series = {"time": [], "temperature_2m": [], "precipitation_probability": [], "weather_code": []}
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            window = self.rain_window(lat, lon, day)
+            for hour in range(24):
+                temperature, weather_code, precipitation = self._conditions(lat, lon, day, hour, window)
+                series["time"].append(f"{day.isoformat()}T{hour:02d}:00")
+                series["temperature_2m"].append(temperature)
+                series["precipitation_probability"].append(precipitation)
+                series["weather_code"].append(weather_code)
+        return series
+
+    def named_location(self, place: str) -> tuple[float, float]:
+        """Stable made-up coordinates for a place we have no coordinates for."""
+        h = _key(self.seed, place.lower().strip())
+        return -60 + 130 * _unit(h), -180 + 360 * _unit(_mix(h))
+
+    def observe_named(self, place: str, day: date | None = None, hour: int | None = None) -> dict:
+        """Weather for a place without known coordinates (hashed to a stable location)."""
+        return self.observe(*self.named_location(place), day, hour)
+
+
+_market = None
+_weather = None
+
+
+def get_synthetic_market() -> SyntheticMarket:
+    """Get or create the shared market generator (the walk bank is built on first use)."""
+    global _market
+    if _market is None:
+        _market = SyntheticMarket()
+    return _market
+
+
+def get_synthetic_weather() -> SyntheticWeather:
+    """Get or create the shared weather generator."""
+    global _weather
+    if _weather is None:
+        _weather = SyntheticWeather()
+    return _weather
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    market = get_synthetic_market()
+    market.quote("NVDA")
+    print(f"First quote (builds one walk): {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    market._build_all()
+    print(f"Whole walk bank: {(time.perf_counter() - start) * 1000:.1f} ms")
+    symbols = synthetic_symbols(100_000)
+
+    start = time.perf_counter()
+    columns = market.quotes(symbols, minute=200)
+    elapsed = time.perf_counter() - start
+    print(f"{len(symbols):,} quotes in {elapsed:.2f}s ({elapsed / len(symbols) * 1e6:.1f} µs/quote)")
+    print(f"Column memory: {sum(c.itemsize * len(c) for c in columns.values()) / 1e6:.1f} MB")
+    print(market.quote("NVDA"))
+    print(get_synthetic_weather().observe(40.7128, -74.0060))
@@ -0,0 +1,53 @@
+"""The fast planner only plans queries it can match completely."""
+
+import pytest
+
+from assignments.fast_planner import plan_locally
+from tools.prefetch import extract_tickers, unresolved_names
+
+
+def planned(plan: list[dict]) -> set:
+    return {(step["tool"], next(iter(step["args"].values()))) for step in plan}
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("What's the outlook for NVDA stock in NYC today?",
+     {("get_weather", "New York"), ("get_stock_price", "NVDA")}),
+    ("How are Apple and Tesla doing in Seattle?",
+     {("get_weather", "Seattle"), ("get_stock_price", "AAPL"), ("get_stock_price", "TSLA")}),
+    ("Is it raining in London?", {("get_weather", "London")}),
+])
+def test_simple_queries_are_planned_locally(query, expected):
+    assert planned(plan_locally(query)) == expected
+
+
+@pytest.mark.parametrize("query", [
+    # A symbol written as a word is not taken as a ticker, and not silently dropped
+    "How are Meta and Tesla doing in Seattle?",
+    "How is Meta doing? And Apple?",
+    "Is the weather in London bad for Meta?",
+    # Names only match exactly: "Palantir" and "Amazon" are short forms
+    "How are NVDA and Palantir doing in Seattle?",
+    "What about Visa and Amazon in Tokyo?",
+    # Needs a forecast, not the current weather
+    "Is it going to rain in London this afternoon?",
+    "Will it rain in London on Thursday?",
+    "Tell me about XYZQ",
+])
+def test_partial_matches_fall_back_to_the_llm(query):
+    assert plan_locally(query) is None
+
+
+@pytest.mark.parametrize("query, tickers, unresolved", [
+    ("How are Meta and Tesla doing in Seattle?", ["TSLA"], "Meta"),
+    ("How is Meta doing? And Apple?", ["AAPL"], "Meta"),
+    ("NVDA and Palantir in NYC", ["NVDA"], "Palantir"),
+])
+def test_words_not_extracted_are_reported_unresolved(query, tickers, unresolved):
+    assert extract_tickers(query) == tickers
+    assert unresolved in unresolved_names(query)
+
+
+def test_city_aliases_are_not_tickers():
+    assert extract_tickers("NVDA in NYC") == ["NVDA"]
+    assert extract_tickers("$SF and Goldman Sachs") == ["SF", "GS"]
@@ -0,0 +1,50 @@
+"""get_stock_price rejects what the local ticker universe does not list."""
+
+import pytest
+
+from tools import stock_tool, upstream
+from tools.cache import FileCacheBackend, set_cache_backend
+
+
+class EmptyQuoteResponse:
+    """What FMP answers for a symbol it does not know."""
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return []
+
+
+@pytest.fixture
+def live_fmp(monkeypatch, tmp_path):
+    """Point the stock tool at FMP (not mock data), with a scratch cache, and record every call."""
+    calls = []
+
+    def get(url, params, name):
+        calls.append(params["symbol"])
+        return EmptyQuoteResponse()
+
+    monkeypatch.setattr(stock_tool, "USE_MOCK_STOCK", False)
+    monkeypatch.setattr(upstream, "get", get)
+    set_cache_backend(FileCacheBackend(tmp_path))
+    yield calls
+    set_cache_backend(None)
+
+
+@pytest.mark.parametrize("ticker", ["XYZQ", "$XYZQ", "Not A Company"])
+def test_unknown_ticker_rejected_without_network_call(live_fmp, ticker):
+    assert stock_tool.fetch_stock_quote(ticker) is None
+    assert stock_tool.get_stock_price(ticker).startswith("Unknown ticker")
+    assert live_fmp == []
+
+
+def test_empty_upstream_result_is_not_replaced_by_mock_data(live_fmp):
+    assert stock_tool.fetch_stock_quote("AAPL") is None
+    assert stock_tool.get_stock_price("AAPL").startswith("Unknown ticker")
+    assert set(live_fmp) == {"AAPL"}
+
+
+@pytest.mark.parametrize("query, symbol", [("brk.b", "BRK-B"), ("Apple", "AAPL"), ("Target", "TGT")])
+def test_listed_tickers_and_names_resolve(query, symbol):
+    assert stock_tool.resolve_ticker(query) == symbol
@@ -1,7 +1,10 @@
 """Tool definitions and registry for the stock-weather agent."""
 
-from tools.stock_tool import get_stock_price
-from tools.weather_tool import get_weather
+from tools.backtest import backtest_rain_effect
+from tools.forecast_tool import fetch_forecast, get_forecast
+from tools.results import Forecast, StockQuote, WeatherReport
+from tools.stock_tool import fetch_stock_quote, get_stock_price
+from tools.weather_tool import fetch_weather, get_weather
 
 # OpenAI-format tool definitions
 TOOLS = [
@@ -40,12 +43,112 @@ TOOLS = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_forecast",
+            "description": "Get the hourly weather forecast for a city for the coming days: rain hours, precipitation chance and temperature range per day, or the conditions at one hour. Use this for questions about upcoming weather (tomorrow, a weekday, a date).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "city": {
+                        "type": "string",
+                        "description": "The city name (e.g., 'New York', 'London', 'Tokyo'). Defaults to 'New York' if not specified.",
+                        "default": "New York",
+                    },
+                    "day": {
+                        "type": "string",
+                        "description": "'today', 'tomorrow', a weekday name (e.g., 'friday') or a date (YYYY-MM-DD). Omit for a summary of every day.",
+                    },
+                    "hour": {
+                        "type": "integer",
+                        "description": "Hour of the day (0-23) to get the conditions for a single hour.",
+                    },
+                },
+                "required": [],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "backtest_rain_effect",
+            "description": "Backtest the rain theory: compare each stock's average daily return on rainy vs. dry days in each city over past trading days, with correlation and a 95% confidence interval. Use this to check whether rain has actually mattered for a stock.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tickers": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Stock ticker symbols (e.g., ['AAPL', 'NVDA'])",
+                    },
+                    "cities": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "City names (e.g., ['New York', 'London']). Defaults to New York.",
+                    },
+                    "days": {
+                        "type": "integer",
+                        "description": "Number of past trading days to analyse (default 250).",
+                        "default": 250,
+                    },
+                },
+                "required": ["tickers"],
+            },
+        },
+    },
 ]
 
 # Map function names to their implementations
 TOOL_FUNCTIONS = {
     "get_stock_price": get_stock_price,
     "get_weather": get_weather,
+    "get_forecast": get_forecast,
+    "backtest_rain_effect": backtest_rain_effect,
 }
 
-__all__ = ["TOOLS", "TOOL_FUNCTIONS", "get_stock_price", "get_weather"]
+
+def call_tool(fn_name: str, fn_args: dict) -> str:
+    """
+    Run an LLM tool call, reading each argument by name with a default.
+
+    Unlike `TOOL_FUNCTIONS[fn_name](**fn_args)`, a misnamed, missing or
+    extra argument from the model does not raise; the tool gets its default.
+
+    Raises:
+        KeyError: If `fn_name` is not a tool.
+    """
+    if fn_name == "get_stock_price":
+        return get_stock_price(str(fn_args.get("ticker") or fn_args.get("symbol") or "AAPL"))
+    if fn_name == "get_weather":
+        return get_weather(str(fn_args.get("city") or fn_args.get("location") or "New York"))
+    if fn_name == "get_forecast":
+        return get_forecast(
+            fn_args.get("city") or fn_args.get("location") or "New York",
+            fn_args.get("day") or fn_args.get("date"),
+            fn_args.get("hour"),
+        )
+    if fn_name == "backtest_rain_effect":
+        return backtest_rain_effect(
+            fn_args.get("tickers") or fn_args.get("ticker") or [],
+            fn_args.get("cities") or fn_args.get("city"),
+            fn_args.get("days"),
+        )
+    raise KeyError(fn_name)
+
+
+__all__ = [
+    "TOOLS",
+    "TOOL_FUNCTIONS",
+    "call_tool",
+    "get_stock_price",
+    "get_weather",
+    "get_forecast",
+    "backtest_rain_effect",
+    "fetch_stock_quote",
+    "fetch_weather",
+    "fetch_forecast",
+    "Forecast",
+    "StockQuote",
+    "WeatherReport",
+]
@@ -0,0 +1,353 @@
+"""
+Rain vs. returns backtest - puts a number on the agent's favourite theory.
+
+Joins daily returns for a set of tickers with rainy/dry days for a set of
+cities and computes, for every ticker x city pair at once:
+
+- mean return on rainy days, on dry days, and their difference
+- the rain/return correlation (point-biserial)
+- a bootstrap 95% confidence interval for the difference (days resampled
+  with replacement)
+
+Everything is a handful of `np.einsum` contractions over (day x ticker) and
+(day x city) matrices, so thousands of pairs take well under a second. Data
+comes from the recorded history (`tools/history.py`) when there is enough
+of it, otherwise from the seeded synthetic generators - which have no rain
+effect built in, a useful baseline.
+
+Needs NumPy (`pip install stock-weather-agent[history]`).
+
+Usage:
+    python -m tools.backtest
+"""
+
+import time
+import warnings
+from datetime import date, timedelta
+
+from config import get_city_coordinates, normalize_city
+from synthetic_data import get_synthetic_market, get_synthetic_weather
+from tools.history import get_history_store
+from tools.results import RAIN_CODES
+from tools.ticker_index import resolve_ticker
+
+DEFAULT_DAYS = 250
+DEFAULT_BOOTSTRAP = 1000
+
+# Recorded history is used only if every pair has at least this many days
+MIN_HISTORY_DAYS = 30
+
+SOURCE_HISTORY = "history"
+SOURCE_SYNTHETIC = "synthetic"
+
+# Pairs listed one by one in the text; bigger results are summarized
+MAX_LISTED_PAIRS = 8
+
+
+def trading_days(n: int, end: date | None = None) -> list[date]:
+    """The last `n` weekdays up to and including `end` (default: yesterday)."""
+    day = end or date.today() - timedelta(days=1)
+    days = []
+    while len(days) < n:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+def synthetic_matrices(tickers: list[str], coords: list[tuple[float, float]], days: list[date]):
+    """Returns (day x ticker) and rain flags (day x city) from the synthetic generators."""
+    returns = get_synthetic_market().daily_returns(tickers, days)
+    rain = get_synthetic_weather().rainy_days(coords, days).astype("f8")
+    return returns, rain
+
+
+def history_matrices(tickers: list[str], coords: list[tuple[float, float]], days: list[date]):
+    """
+    Returns (day x ticker) and rain flags (day x city) from the history store.
+
+    Days without a recording are NaN. A ticker's return for a day is the
+    change % of its last quote that (UTC) day; a city counts as rainy if any
+    observation that day had a rain code.
+
+    Returns:
+        (returns, rain), or None if there is no history store.
+    """
+    import numpy as np
+
+    store = get_history_store()
+    if store is None:
+        return None
+    first = (days[0] - date(1970, 1, 1)).days
+    n_days = (days[-1] - days[0]).days + 1
+    start, end = first * 86400.0, (first + n_days) * 86400.0
+    # Rows are calendar days; keep only the requested trading days at the end
+    keep = np.array([(d - days[0]).days for d in days])
+
+    returns = np.full((n_days, len(tickers)), np.nan)
+    for j, ticker in enumerate(tickers):
+        rows = store.quotes_for(ticker, start, end)
+        day_index = (rows["ts"] // 86400).astype(np.int64) - first
+        # Last quote of each day: first occurrence in the reversed arrays
+        unique, last = np.unique(day_index[::-1], return_index=True)
+        returns[unique, j] = rows["change_pct"][::-1][last] / 100.0
+
+    rain = np.full((n_days, len(coords)), np.nan)
+    rain_codes = np.array(sorted(RAIN_CODES))
+    for j, (lat, lon) in enumerate(coords):
+        rows = store.weather_for(lat, lon, start, end)
+        day_index = (rows["ts"] // 86400).astype(np.int64) - first
+        rainy = np.isin(rows["weather_code"], rain_codes).astype("f8")
+        column = np.zeros(n_days)
+        seen = np.zeros(n_days, dtype=bool)
+        np.maximum.at(column, day_index, rainy)
+        seen[day_index] = True
+        rain[seen, j] = column[seen]
+
+    return returns[keep], rain[keep]
+
+
+def rain_effect(returns, rain, n_bootstrap: int = DEFAULT_BOOTSTRAP, seed: int = 0) -> dict:
+    """
+    Rain statistics for every ticker x city pair in one pass.
+
+    Args:
+        returns: (days x tickers) daily returns, NaN where unknown
+        rain: (days x cities) 1.0 rainy / 0.0 dry, NaN where unknown
+        n_bootstrap: Bootstrap resamples for the confidence interval (0 to skip)
+        seed: Seed for the resampling
+
+    Returns:
+        Dict of (tickers x cities) arrays: "days", "rainy_days", "mean_rain",
+        "mean_dry", "diff", "corr", and "ci_low"/"ci_high" for the 95%
+        interval of diff. Pairs without both rainy and dry days are NaN.
+    """
+    import numpy as np
+
+    r_ok = ~np.isnan(returns)
+    w_ok = ~np.isnan(rain)
+    r = np.where(r_ok, returns, 0.0)
+    w = np.where(w_ok, rain, 0.0)
+    r_ok = r_ok.astype("f8")
+    w_ok = w_ok.astype("f8")
+
+    # Stack so one contraction yields every per-pair sum we need:
+    # left [r, r^2, valid] x right [rain, valid]
+    left = np.concatenate([r, r * r, r_ok], axis=1)
+    right = np.concatenate([w, w_ok], axis=1)
+    sums = np.einsum("tn,tm->nm", left, right)
+    sums = _split(sums, r.shape[1], w.shape[1])
+
+    n = sums["valid", "valid"]
+    n_rain = sums["valid", "rain"]
+    s_rain = sums["r", "rain"]
+    s_all = sums["r", "valid"]
+    s_sq = sums["r2", "valid"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_rain = s_rain / n_rain
+        mean_dry = (s_all - s_rain) / (n - n_rain)
+        corr = (n * s_rain - s_all * n_rain) / np.sqrt((n * s_sq - s_all ** 2) * (n * n_rain - n_rain ** 2))
+
+    result = {
+        "days": n.astype(int),
+        "rainy_days": n_rain.astype(int),
+        "mean_rain": mean_rain,
+        "mean_dry": mean_dry,
+        "diff": mean_rain - mean_dry,
+        "corr": corr,
+    }
+
+    if n_bootstrap:
+        # Each resample is a vector of day weights (how often each day was drawn)
+        rng = np.random.default_rng(seed)
+        t = r.shape[0]
+        weights = rng.multinomial(t, np.full(t, 1.0 / t), size=n_bootstrap).astype("f4")
+        boot_left = np.concatenate([r, r_ok], axis=1).astype("f4")
+        boot = np.einsum("bt,tn,tm->bnm", weights, boot_left, right.astype("f4"), optimize=True)
+        nt, nc = r.shape[1], w.shape[1]
+        b_s_rain, b_s_all = boot[:, :nt, :nc], boot[:, :nt, nc:]
+        b_n_rain, b_n = boot[:, nt:, :nc], boot[:, nt:, nc:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            b_diff = b_s_rain / b_n_rain - (b_s_all - b_s_rain) / (b_n - b_n_rain)
+        # nanpercentile is several times slower - only pay for it when a resample drew no rainy/dry day
+        percentile = np.nanpercentile if np.isnan(b_diff).any() else np.percentile
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN pairs stay NaN
+            result["ci_low"], result["ci_high"] = percentile(b_diff, [2.5, 97.5], axis=0)
+    return result
+
+
+def _split(sums, n_tickers: int, n_cities: int) -> dict:
+    """Name the blocks of the stacked sum matrix."""
+    rows = {"r": slice(0, n_tickers), "r2": slice(n_tickers, 2 * n_tickers), "valid": slice(2 * n_tickers, None)}
+    cols = {"rain": slice(0, n_cities), "valid": slice(n_cities, None)}
+    return {(a, b): sums[rs, cs] for a, rs in rows.items() for b, cs in cols.items()}
+
+
+class BacktestResult:
+    """Per-pair rain statistics; `str()` renders a summary for the LLM."""
+
+    __slots__ = ("tickers", "cities", "stats", "source", "skipped")
+
+    def __init__(self, tickers: list[str], cities: list[str], stats: dict, source: str, skipped: list[str]):
+        self.tickers = tickers
+        self.cities = cities
+        self.stats = stats
+        self.source = source
+        self.skipped = skipped
+
+    def pair(self, ticker: str, city: str) -> dict:
+        """All statistics for one ticker x city pair."""
+        i, j = self.tickers.index(ticker), self.cities.index(city)
+        return {name: values[i, j].item() for name, values in self.stats.items()}
+
+    def __str__(self) -> str:
+        import numpy as np
+
+        if not self.stats:
+            return f"Nothing to backtest (unknown: {', '.join(self.skipped) or 'no tickers or cities given'})."
+
+        s = self.stats
+        lines = [f"Rain vs. daily returns ({self.source} data, {int(s['days'].max())} trading days):"]
+        pairs = [(i, j) for i in range(len(self.tickers)) for j in range(len(self.cities))]
+        if len(pairs) > MAX_LISTED_PAIRS:
+            significant = (s["ci_high"] < 0) | (s["ci_low"] > 0) if "ci_low" in s else np.zeros_like(s["diff"], bool)
+            lines.append(
+                f"{len(pairs)} ticker x city pairs; mean rainy-minus-dry return {np.nanmean(s['diff']) * 100:+.3f}%, "
+                f"mean correlation {np.nanmean(s['corr']):+.3f}; "
+                f"{int(significant.sum())} pairs with a 95% CI excluding zero."
+            )
+            lines.append("Most negative pairs:")
+            order = np.argsort(np.nan_to_num(s["diff"], nan=np.inf), axis=None)[:5]
+            pairs = [np.unravel_index(k, s["diff"].shape) for k in order]
+        for i, j in pairs:
+            if s["rainy_days"][i, j] in (0, s["days"][i, j]):
+                lines.append(f"- {self.tickers[i]} x {self.cities[j]}: not enough data "
+                             f"({s['rainy_days'][i, j]}/{s['days'][i, j]} rainy days)")
+                continue
+            line = (
+                f"- {self.tickers[i]} x {self.cities[j]}: rainy {s['mean_rain'][i, j] * 100:+.2f}% vs dry "
+                f"{s['mean_dry'][i, j] * 100:+.2f}% (diff {s['diff'][i, j] * 100:+.2f}%"
+            )
+            if "ci_low" in s:
+                line += f", 95% CI [{s['ci_low'][i, j] * 100:+.2f}, {s['ci_high'][i, j] * 100:+.2f}]"
+            line += f"), corr {s['corr'][i, j]:+.3f}, {s['rainy_days'][i, j]}/{s['days'][i, j]} rainy days"
+            lines.append(line)
+        if self.skipped:
+            lines.append(f"Skipped (unknown): {', '.join(self.skipped)}")
+        return "\n".join(lines)
+
+
+def run_backtest(
+    tickers: list[str],
+    cities: list[str],
+    days: int = DEFAULT_DAYS,
+    source: str = "auto",
+    n_bootstrap: int = DEFAULT_BOOTSTRAP,
+) -> BacktestResult:
+    """
+    Backtest rainy-day returns for every ticker x city pair.
+
+    Args:
+        tickers: Ticker symbols or company names
+        cities: City names (must have known coordinates)
+        days: Trading days to look back
+        source: "history", "synthetic", or "auto" (history if it covers
+            at least MIN_HISTORY_DAYS days for every pair)
+        n_bootstrap: Bootstrap resamples for the confidence intervals
+
+    Returns:
+        A BacktestResult.
+    """
+    skipped = []
+    symbols, names, coords = [], [], []
+    for ticker in tickers:
+        symbol = resolve_ticker(ticker)
+        if symbol is None:
+            skipped.append(ticker)
+        elif symbol not in symbols:
+            symbols.append(symbol)
+    for city in cities:
+        found = get_city_coordinates(city)
+        if found is None:
+            skipped.append(city)
+        elif found not in coords:
+            names.append(normalize_city(city).title())
+            coords.append(found)
+    if not symbols or not coords:
+        return BacktestResult(symbols, names, {}, source, skipped)
+
+    day_list = trading_days(days)
+    matrices = None
+    if source in ("auto", SOURCE_HISTORY):
+        matrices = history_matrices(symbols, coords, day_list)
+        if matrices is not None and source == "auto":
+            stats = rain_effect(*matrices, n_bootstrap=0)
+            if stats["days"].min() < MIN_HISTORY_DAYS:
+                matrices = None
+    if matrices is None and source != SOURCE_HISTORY:
+        source = SOURCE_SYNTHETIC
+        matrices = synthetic_matrices(symbols, coords, day_list)
+    elif source == "auto":
+        source = SOURCE_HISTORY
+    if matrices is None:
+        return BacktestResult(symbols, names, {}, source, skipped + ["(history store unavailable)"])
+
+    return BacktestResult(symbols, names, rain_effect(*matrices, n_bootstrap=n_bootstrap), source, skipped)
+
+
+def _names(value) -> list[str]:
+    """A list of names from what an LLM passes: a list, one name, or "AAPL, NVDA"."""
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [v.strip() for v in value if isinstance(v, str) and v.strip()]
+
+
+def backtest_rain_effect(
+    tickers: list[str] | str, cities: list[str] | str | None = None, days: int = DEFAULT_DAYS
+) -> str:
+    """
+    Agent tool: how have these stocks done on rainy vs. dry days in these cities?
+
+    Args:
+        tickers: Ticker symbols or company names (a list or one string)
+        cities: City names, a list or one string (default: New York)
+        days: Trading days to look back (default: 250, also used if `days`
+            is not a number)
+
+    Returns:
+        A text summary of the per-pair statistics, or an error message.
+    """
+    tickers = _names(tickers)
+    if not tickers:
+        return "No tickers to backtest: pass tickers as a list of symbols, e.g. ['AAPL', 'NVDA']."
+    try:
+        days = int(days)
+    except (TypeError, ValueError):
+        days = DEFAULT_DAYS
+    try:
+        return str(run_backtest(tickers, _names(cities) or ["New York"], max(10, min(days, 5000))))
+    except ImportError:
+        return "Backtesting is unavailable: NumPy is not installed."
+
+
+if __name__ == "__main__":
+    from synthetic_data import synthetic_symbols
+
+    print(backtest_rain_effect(["AAPL", "NVDA"], ["New York", "Seattle"]))
+
+    # Full matrix timing on synthetic data
+    tickers = synthetic_symbols(200)
+    coords = [(lat, lon) for lat in range(-40, 60, 10) for lon in range(-120, 150, 30)][:20]
+    day_list = trading_days(DEFAULT_DAYS)
+    start = time.perf_counter()
+    matrices = synthetic_matrices(tickers, coords, day_list)
+    generated = time.perf_counter()
+    stats = rain_effect(*matrices)
+    done = time.perf_counter()
+    print(f"\n{len(tickers)} tickers x {len(coords)} cities = {len(tickers) * len(coords):,} pairs, "
+          f"{len(day_list)} days, {DEFAULT_BOOTSTRAP} bootstrap resamples: "
+          f"data {generated - start:.2f}s, statistics {done - generated:.2f}s")
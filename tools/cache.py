@@ -0,0 +1,346 @@
+"""
+Pluggable cache backends for the tools.
+
+The tools talk to a `CacheBackend` (get/set/get_many/lock by string key) and
+never to files or sockets directly. Two backends ship:
+
+- `FileCacheBackend` (default): JSON files in CACHE_DIR. Safe across threads
+  and processes - writes are atomic renames, and `lock()` uses a lock file
+  so only one process fetches a missing entry.
+- `RemoteCacheBackend`: the shared `cache_server.py`, so every host in a
+  fleet reuses the others' fetches. Keeps a small local near-cache that the
+  server invalidates on every change.
+
+Select with CACHE_BACKEND=file|remote (and CACHE_SERVER_ADDRESS for remote).
+If a packed snapshot exists (CACHE_SNAPSHOT_FILE, see `tools/cache_snapshot.py`),
+it is mapped and layered in front of the file backend. It is a copy of the
+local files, so it is not used with the remote backend.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+
+from config import CACHE_BACKEND, CACHE_DIR, CACHE_SERVER_ADDRESS, CACHE_TTL_HOURS
+from deadline import timeout_for
+
+DEFAULT_TTL_SECONDS = int(CACHE_TTL_HOURS * 3600)
+
+# Locks older than this are assumed abandoned (crashed worker) and broken
+LOCK_STALE_SECONDS = 30
+
+# Longest wait for another worker's fetch (capped at the query's remaining budget)
+LOCK_WAIT_SECONDS = 10.0
+
+# How far back get_stale() looks for an older entry when there is no time to fetch
+STALE_DAYS = 7
+
+
+def read_cache(cache_file: Path) -> dict | None:
+    """Read a cache entry, or None if it is missing or corrupted."""
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def write_cache(cache_file: Path, data: dict) -> None:
+    """Atomically write a cache entry (silently gives up on I/O errors)."""
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, prefix=f".{cache_file.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass  # Silently fail on cache write errors
+
+
+@contextmanager
+def cache_lock(cache_file: Path, timeout: float = LOCK_WAIT_SECONDS, poll_interval: float = 0.05):
+    """
+    Hold a cross-process lock for filling `cache_file`.
+
+    Yields True if we got the lock (go fetch), or False if another process
+    filled the entry while we waited or the wait timed out (`timeout`, or
+    less if the query's deadline is closer). Either way the caller should
+    re-check the cache first.
+    """
+    lock_file = cache_file.with_name(cache_file.name + ".lock")
+    deadline = time.monotonic() + timeout_for(timeout)
+    acquired = False
+
+    while True:
+        try:
+            os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            acquired = True
+            break
+        except FileExistsError:
+            pass
+        except OSError:
+            break  # Can't lock (read-only dir?) - just proceed unlocked
+
+        if cache_file.exists() or time.monotonic() >= deadline:
+            break
+        try:
+            if time.time() - lock_file.stat().st_mtime > LOCK_STALE_SECONDS:
+                lock_file.unlink()
+                continue
+        except FileNotFoundError:
+            continue
+        time.sleep(poll_interval)
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                lock_file.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class CacheBackend(ABC):
+    """Interface the tools use to cache JSON-serializable dicts by key."""
+
+    @abstractmethod
+    def get(self, key: str) -> dict | None:
+        """The entry for `key`, or None on a miss."""
+
+    @abstractmethod
+    def set(self, key: str, data: dict, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+        """Store `data` under `key` for `ttl` seconds (best effort)."""
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """Fetch several keys at once; missing keys are left out of the result."""
+        found = {}
+        for key in keys:
+            data = self.get(key)
+            if data is not None:
+                found[key] = data
+        return found
+
+    @contextmanager
+    def lock(self, key: str):
+        """Hold the right to fill `key`; callers re-check the cache inside."""
+        yield True
+
+
+class FileCacheBackend(CacheBackend):
+    """JSON files in a directory, one per key (the original cache layout)."""
+
+    def __init__(self, directory: Path = CACHE_DIR):
+        self.directory = Path(directory)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        return read_cache(self.path(key))
+
+    def set(self, key: str, data: dict, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+        # Keys carry the date, so day-old files simply stop being looked up
+        write_cache(self.path(key), data)
+
+    @contextmanager
+    def lock(self, key: str):
+        with cache_lock(self.path(key)) as acquired:
+            yield acquired
+
+
+class RemoteCacheBackend(CacheBackend):
+    """
+    Client for the shared cache server, with a local near-cache.
+
+    Reads are served from the near-cache when possible; the server pushes an
+    invalidation for every set/delete so near-cache entries never outlive a
+    change elsewhere in the fleet (and expire after `near_ttl` regardless).
+    Nothing is kept locally until the server has acknowledged the
+    subscription, and a value is only kept if no invalidation arrived while
+    it was being fetched. If the server is unreachable, the backend behaves
+    like an empty cache.
+    """
+
+    def __init__(self, address: str = CACHE_SERVER_ADDRESS, near_ttl: float = 30.0, near_size: int = 4096):
+        from cache_server import CacheClient
+
+        self.client = CacheClient(address)
+        self.near_ttl = near_ttl
+        self.near_size = near_size
+        self._near: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._near_lock = threading.Lock()
+        self._subscribed = False
+        # Set once the server acknowledged the subscription; bumped on every invalidation
+        self._feed_live = False
+        self._generation = 0
+
+    def _ensure_subscribed(self) -> None:
+        with self._near_lock:
+            if self._subscribed:
+                return
+            self._subscribed = True
+        self.client.subscribe(self._invalidate, self._feed_started)
+
+    def _feed_started(self) -> None:
+        with self._near_lock:
+            self._feed_live = True
+
+    def _invalidate(self, key: bytes | None) -> None:
+        with self._near_lock:
+            self._generation += 1
+            if key is None:
+                # Lost the invalidation feed - drop everything and resubscribe on next use
+                self._near.clear()
+                self._subscribed = False
+                self._feed_live = False
+            else:
+                self._near.pop(key.decode(), None)
+
+    def _near_token(self) -> int | None:
+        """Taken before a server round trip; None while the near-cache cannot be trusted."""
+        self._ensure_subscribed()
+        with self._near_lock:
+            return self._generation if self._feed_live else None
+
+    def _near_get(self, key: str) -> dict | None:
+        with self._near_lock:
+            entry = self._near.get(key)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires <= time.monotonic():
+                del self._near[key]
+                return None
+            self._near.move_to_end(key)
+            return data
+
+    def _near_put(self, key: str, data: dict, token: int | None) -> None:
+        with self._near_lock:
+            if token is None or token != self._generation:
+                return  # Feed not up yet, or something changed while we were fetching
+            self._near[key] = (time.monotonic() + self.near_ttl, data)
+            self._near.move_to_end(key)
+            while len(self._near) > self.near_size:
+                self._near.popitem(last=False)
+
+    def get(self, key: str) -> dict | None:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        found = {}
+        missing = []
+        for key in keys:
+            data = self._near_get(key)
+            if data is not None:
+                found[key] = data
+            else:
+                missing.append(key)
+        if not missing:
+            return found
+
+        try:
+            token = self._near_token()
+            values = self.client.get_many([k.encode() for k in missing])
+        except OSError:
+            return found
+        for key, value in zip(missing, values):
+            if value is not None:
+                data = json.loads(value)
+                self._near_put(key, data, token)
+                found[key] = data
+        return found
+
+    def set(self, key: str, data: dict, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+        try:
+            token = self._near_token()
+            self.client.set(key.encode(), json.dumps(data, separators=(",", ":")).encode(), ttl)
+        except OSError:
+            return
+        # Our own set is broadcast back to us too; if that already arrived, skip the put
+        self._near_put(key, data, token)
+
+    @contextmanager
+    def lock(self, key: str, timeout: float = LOCK_WAIT_SECONDS, poll_interval: float = 0.05):
+        """
+        Fleet-wide fetch lock: an ADD on "lock:<key>" that only one host wins.
+
+        The lock holds a random token, and is released only if it still
+        holds it: a holder that outlived the TTL must not delete a lock
+        another host has taken since.
+        """
+        lock_key = f"lock:{key}".encode()
+        token = os.urandom(16).hex().encode()
+        acquired = False
+        deadline = time.monotonic() + timeout_for(timeout)
+        try:
+            while True:
+                try:
+                    acquired = self.client.add(lock_key, token, ttl=int(timeout) + 1)
+                except OSError:
+                    break
+                if acquired or self.get(key) is not None or time.monotonic() >= deadline:
+                    break
+                time.sleep(poll_interval)
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    self.client.delete_if(lock_key, token)
+                except OSError:
+                    pass
+
+
+def get_stale(backend: CacheBackend, prefix: str, max_age_days: int = STALE_DAYS) -> tuple[dict, str] | None:
+    """
+    Most recent earlier-day entry for a "<prefix>_<date>" key (for degraded answers).
+
+    Returns:
+        (data, date) of the newest entry from the last `max_age_days` days
+        before today, or None.
+    """
+    today = date.today()
+    keys = [f"{prefix}_{(today - timedelta(days=age)).isoformat()}" for age in range(1, max_age_days + 1)]
+    found = backend.get_many(keys)
+    for key in keys:
+        if key in found:
+            return found[key], key[len(prefix) + 1:]
+    return None
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_cache_backend() -> CacheBackend:
+    """Get or create the configured cache backend."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                from tools.cache_snapshot import SnapshotCacheBackend, open_snapshot
+
+                if CACHE_BACKEND == "remote":
+                    # A snapshot of local files would shadow fresher fleet-wide entries
+                    _backend = RemoteCacheBackend()
+                else:
+                    backend = FileCacheBackend()
+                    snapshot = open_snapshot()
+                    _backend = backend if snapshot is None else SnapshotCacheBackend(backend, snapshot)
+    return _backend
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """Swap the cache backend (e.g. to a RemoteCacheBackend on an in-process server in tests)."""
+    global _backend
+    _backend = backend
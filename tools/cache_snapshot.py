@@ -0,0 +1,280 @@
+"""
+Packed, memory-mappable snapshot of the file cache for warm starts.
+
+A fresh process otherwise opens and parses one JSON file per lookup. The
+snapshot packs every entry in CACHE_DIR into a single file that is mapped at
+startup; a lookup is a binary search over the mapped index, and only the value
+that was asked for is parsed:
+
+    header   <8sHHIdQ   magic, version, reserved, entry count, created (unix), index offset
+    values   compact JSON, back to back
+    keys     UTF-8, back to back
+    index    <Q         64-bit key hash per entry, sorted
+             <QHQId     per entry (same order): key offset, key length,
+                        value offset, value length, source file mtime
+
+The hash column is searched with `bisect` straight on the mapped bytes, so a
+lookup costs one hash, a C-level binary search and one key compare.
+
+Writing is incremental: entries whose file has the same mtime as in the
+previous snapshot are copied over as bytes instead of being read and parsed
+again. The new file replaces the old one atomically, so processes that
+already mapped it keep a consistent view.
+
+Usage:
+    python -m tools.cache_snapshot              # (re)write cache/cache.snap
+    python -m tools.cache_snapshot --info       # header and entry count
+    python -m tools.cache_snapshot --get KEY    # look up one entry
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from config import CACHE_DIR, CACHE_SNAPSHOT_FILE
+from tools.cache import DEFAULT_TTL_SECONDS, CacheBackend
+
+MAGIC = b"SWCACHE\x00"
+VERSION = 1
+
+HEADER = struct.Struct("<8sHHIdQ")
+KEY_HASH = struct.Struct("<Q")
+INDEX_ENTRY = struct.Struct("<QHQId")
+
+
+def key_hash(key: bytes) -> int:
+    """Stable 64-bit hash of a cache key (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class CacheSnapshot:
+    """
+    Read-only view of a snapshot file through a memory map.
+
+    Raises:
+        ValueError: If the file is not a snapshot or has another version
+            (or the host is big-endian: the hash column is read in place).
+    """
+
+    def __init__(self, path: Path = CACHE_SNAPSHOT_FILE):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"{self.path} is not a cache snapshot")
+        magic, version, _, self.count, self.created, self._index = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a cache snapshot")
+        if version != VERSION:
+            raise ValueError(f"{self.path} has snapshot version {version}, expected {VERSION}")
+        self._entries = self._index + self.count * KEY_HASH.size
+        if self._entries + self.count * INDEX_ENTRY.size > len(self._mm):
+            raise ValueError(f"{self.path} is truncated")
+        if sys.byteorder != "little":
+            raise ValueError("cache snapshots are only supported on little-endian hosts")
+        self._hashes = memoryview(self._mm)[self._index:self._entries].cast("Q")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, i: int) -> tuple[int, int, int, int, float]:
+        return INDEX_ENTRY.unpack_from(self._mm, self._entries + i * INDEX_ENTRY.size)
+
+    def _key(self, entry: tuple) -> bytes:
+        return self._mm[entry[0]:entry[0] + entry[1]]
+
+    def _find(self, key: str) -> tuple | None:
+        target = key.encode()
+        h = key_hash(target)
+        i = bisect_left(self._hashes, h)
+        # Walk the (almost always single) run of equal hashes
+        while i < self.count and self._hashes[i] == h:
+            entry = self._entry(i)
+            if self._key(entry) == target:
+                return entry
+            i += 1
+        return None
+
+    def raw(self, key: str) -> bytes | None:
+        """The entry's JSON bytes, or None if the key is not in the snapshot."""
+        entry = self._find(key)
+        return None if entry is None else self._mm[entry[2]:entry[2] + entry[3]]
+
+    def get(self, key: str) -> dict | None:
+        raw = self.raw(key)
+        return None if raw is None else json.loads(raw)
+
+    def entries(self):
+        """(key, json bytes, mtime) for every entry, in hash order."""
+        for i in range(self.count):
+            entry = self._entry(i)
+            yield self._key(entry).decode(), self._mm[entry[2]:entry[2] + entry[3]], entry[4]
+
+    def close(self) -> None:
+        self._hashes.release()
+        self._mm.close()
+
+
+def write_snapshot(directory: Path = CACHE_DIR, path: Path = CACHE_SNAPSHOT_FILE) -> dict:
+    """
+    Pack every `*.json` entry in `directory` into a snapshot at `path`.
+
+    Entries unchanged since the previous snapshot (same file mtime) are
+    copied from it without reading the JSON file; entries whose file is
+    gone are dropped.
+
+    Returns:
+        Counts: {"entries": ..., "reused": ..., "read": ..., "bytes": ...}
+    """
+    directory, path = Path(directory), Path(path)
+    previous = {}
+    try:
+        old = CacheSnapshot(path)
+        previous = {key: (raw, mtime) for key, raw, mtime in old.entries()}
+    except (OSError, ValueError):
+        old = None
+
+    values, reused = {}, 0
+    for file in directory.glob("*.json"):
+        key = file.name[:-len(".json")]
+        try:
+            mtime = file.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if key in previous and previous[key][1] == mtime:
+            values[key] = previous[key]
+            reused += 1
+            continue
+        try:
+            with open(file) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue  # Half-written or corrupted - leave it to the file backend
+        values[key] = (json.dumps(data, separators=(",", ":")).encode(), mtime)
+
+    hashes = {key: key_hash(key.encode()) for key in values}
+    keys = sorted(values, key=hashes.get)
+    body = bytearray()
+    offsets = []
+    for key in keys:
+        raw = values[key][0]
+        offsets.append((HEADER.size + len(body), len(raw)))
+        body += raw
+    key_offsets = []
+    for key in keys:
+        encoded = key.encode()
+        key_offsets.append((HEADER.size + len(body), len(encoded)))
+        body += encoded
+    index_offset = HEADER.size + len(body)
+    for key in keys:
+        body += KEY_HASH.pack(hashes[key])
+    for key, (value_offset, value_length), (key_offset, key_length) in zip(keys, offsets, key_offsets):
+        body += INDEX_ENTRY.pack(key_offset, key_length, value_offset, value_length, values[key][1])
+    if old is not None:
+        old.close()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(keys), time.time(), index_offset))
+            f.write(body)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return {"entries": len(keys), "reused": reused, "read": len(keys) - reused, "bytes": HEADER.size + len(body)}
+
+
+class SnapshotCacheBackend(CacheBackend):
+    """
+    A snapshot layered over another backend.
+
+    Reads try the snapshot first and fall through to `base` on a miss.
+    Writes go to `base`, and a key written by this process is read from
+    `base` from then on, so a refetch is never hidden by the older snapshot
+    copy. Cache keys carry the date, so entries written by other processes
+    after the snapshot only matter for same-day refetches.
+    """
+
+    def __init__(self, base: CacheBackend, snapshot: CacheSnapshot):
+        self.base = base
+        self.snapshot = snapshot
+        self._written: set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        if key not in self._written:
+            data = self.snapshot.get(key)
+            if data is not None:
+                return data
+        return self.base.get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        found, missing = {}, []
+        for key in keys:
+            data = None if key in self._written else self.snapshot.get(key)
+            if data is not None:
+                found[key] = data
+            else:
+                missing.append(key)
+        if missing:
+            found.update(self.base.get_many(missing))
+        return found
+
+    def set(self, key: str, data: dict, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+        with self._lock:
+            self._written.add(key)
+        self.base.set(key, data, ttl)
+
+    def lock(self, key: str):
+        return self.base.lock(key)
+
+
+def open_snapshot(path: Path = CACHE_SNAPSHOT_FILE) -> CacheSnapshot | None:
+    """Map the snapshot file, or None if there is none (or it is unreadable)."""
+    try:
+        return CacheSnapshot(path)
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directory", type=Path, default=CACHE_DIR, help="cache directory to pack")
+    parser.add_argument("--output", type=Path, default=CACHE_SNAPSHOT_FILE, help="snapshot file")
+    parser.add_argument("--info", action="store_true", help="describe the snapshot instead of writing it")
+    parser.add_argument("--get", metavar="KEY", help="print one entry from the snapshot")
+    args = parser.parse_args()
+
+    if args.info or args.get:
+        try:
+            snapshot = CacheSnapshot(args.output)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"Cannot open snapshot: {e}")
+        if args.get:
+            data = snapshot.get(args.get)
+            print(json.dumps(data, indent=2) if data is not None else f"{args.get}: not in snapshot")
+        else:
+            created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.created))
+            print(f"{args.output}: version {VERSION}, {len(snapshot)} entries, "
+                  f"{os.path.getsize(args.output):,} bytes, created {created}")
+        return
+
+    t0 = time.perf_counter()
+    stats = write_snapshot(args.directory, args.output)
+    print(f"Wrote {args.output}: {stats['entries']} entries ({stats['reused']} unchanged, {stats['read']} read), "
+          f"{stats['bytes']:,} bytes in {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Multi-day hourly forecast tool using the Open-Meteo API.
+
+One request fetches temperature, precipitation probability and weather code
+for every hour of the next FORECAST_DAYS days. The series is cached per grid
+cell and day as compact arrays (see `results.Forecast`), so every follow-up
+question - "will it rain tomorrow?", "what about Friday at 3pm?", "which
+hours?" - is answered from the cached series without another upstream call.
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+
+import requests
+
+from config import DEFAULT_CITY, FORECAST_DAYS, OPEN_METEO_BASE_URL, get_city_coordinates
+from deadline import budget_low
+from mock_data import get_mock_forecast
+from tools import upstream
+from tools.cache import get_cache_backend, get_stale
+from tools.history import cell_id
+from tools.results import SOURCE_CACHE, SOURCE_LIVE, SOURCE_MOCK, Forecast
+
+HOURLY_VARIABLES = "temperature_2m,precipitation_probability,weather_code"
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+# Decoded series of this process, so repeat questions skip the cache backend too
+_memo: dict[str, Forecast] = {}
+_memo_lock = threading.Lock()
+
+
+def parse_day(text: str | None, today: date | None = None) -> date | None:
+    """
+    Resolve "today", "tomorrow", a weekday name (the next one, today included)
+    or an ISO date. None/empty means no particular day.
+
+    Raises:
+        ValueError: If the text is none of these.
+    """
+    if not text or not text.strip():
+        return None
+    today = today or date.today()
+    text = text.strip().lower()
+    if text == "today":
+        return today
+    if text == "tomorrow":
+        return today + timedelta(days=1)
+    if text in WEEKDAYS:
+        return today + timedelta(days=(WEEKDAYS.index(text) - today.weekday()) % 7)
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Unrecognized day {text!r}: use today, tomorrow, a weekday or YYYY-MM-DD") from None
+
+
+def fetch_forecast(city: str = DEFAULT_CITY, days: int = FORECAST_DAYS) -> Forecast | None:
+    """
+    Get the hourly forecast for a city, starting today.
+
+    Args:
+        city: City name (default: "New York")
+        days: Days needed (at least this many are returned; max 16)
+
+    Returns:
+        A Forecast (source "live", "cache" or "mock"), or None if the city's
+        coordinates are unknown.
+    """
+    city = city.strip()
+    coords = get_city_coordinates(city)
+    if not coords:
+        return None
+    days = min(max(days, 1), 16)
+    today = date.today().isoformat()
+    key_prefix = f"forecast_{cell_id(*coords)}"
+    cache_key = f"{key_prefix}_{today}"
+
+    forecast = _memo.get(cache_key)
+    if forecast is not None and forecast.days >= days:
+        return _for_city(forecast, city)
+
+    cache = get_cache_backend()
+    with cache.lock(cache_key):
+        data = cache.get(cache_key)
+        if data is not None:
+            forecast = Forecast.from_cache(city, data)
+        if forecast is None and budget_low():
+            # Too little of the query's latency budget left to wait on Open-Meteo
+            return _degraded_forecast(city, key_prefix, days)
+        if forecast is None or forecast.days < days:
+            # Nothing cached, or a shorter horizon than asked for: fetch the longer one
+            forecast = _fetch_forecast(city, coords, max(days, FORECAST_DAYS), cache_key)
+    if forecast.source != SOURCE_MOCK:
+        with _memo_lock:
+            # Drop earlier days' series so the memo holds one per location
+            for key in [k for k in _memo if not k.endswith(today)]:
+                del _memo[key]
+            _memo[cache_key] = forecast
+    return forecast
+
+
+def _for_city(forecast: Forecast, city: str) -> Forecast:
+    """The memoized series, relabelled for this caller (cities can share a grid cell)."""
+    return Forecast(
+        city,
+        forecast.start,
+        forecast.temperature,
+        forecast.precipitation_probability,
+        forecast.weather_code,
+        SOURCE_CACHE,
+        forecast.fetched_at,
+    )
+
+
+def _fetch_forecast(city: str, coords: tuple[float, float], days: int, cache_key: str) -> Forecast:
+    """Fetch the hourly series from the Open-Meteo API and cache it."""
+    lat, lon = coords
+    try:
+        url = f"{OPEN_METEO_BASE_URL}/v1/forecast"
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "hourly": HOURLY_VARIABLES,
+            "forecast_days": days,
+            "timezone": "auto",
+        }
+        response = upstream.get(url, params, "open-meteo")
+        response.raise_for_status()
+        forecast = Forecast.from_hourly(city, response.json()["hourly"], SOURCE_LIVE)
+    except (requests.RequestException, KeyError, IndexError, TypeError, ValueError) as e:
+        # API error, fall back to mock data
+        return Forecast.from_hourly(
+            city, get_mock_forecast(city, days), SOURCE_MOCK, f"fallback due to API error: {e}"
+        )
+
+    get_cache_backend().set(cache_key, forecast.to_cache())
+    return forecast
+
+
+def _degraded_forecast(city: str, key_prefix: str, days: int) -> Forecast:
+    """An earlier day's cached series (it starts before today), or mock data if there is none."""
+    stale = get_stale(get_cache_backend(), key_prefix)
+    if stale is not None:
+        data, day = stale
+        forecast = Forecast.from_cache(city, data)
+        forecast.note = f"forecast issued {day}, no time to refresh"
+        return forecast
+    return Forecast.from_hourly(city, get_mock_forecast(city, days), SOURCE_MOCK, "estimated data, no time to fetch")
+
+
+def get_forecast(city: str = DEFAULT_CITY, day: str | None = None, hour: int | None = None) -> str:
+    """
+    Get the hourly forecast for a city: a multi-day summary, one day, or one hour.
+
+    Args:
+        city: City name (default: "New York")
+        day: "today", "tomorrow", a weekday name or YYYY-MM-DD (default: all days)
+        hour: Hour of the day, 0-23 (needs `day`; default: the whole day)
+
+    Returns:
+        A formatted string with the forecast, or an error message.
+    """
+    if not isinstance(city, str) or not city.strip():
+        city = DEFAULT_CITY
+    if day is not None and not isinstance(day, str):
+        return f"Invalid day {day!r}: use today, tomorrow, a weekday or YYYY-MM-DD"
+    try:
+        when = parse_day(day)
+    except ValueError as e:
+        return str(e)
+    if hour is not None:
+        try:
+            hour = int(hour)
+        except (TypeError, ValueError, OverflowError):
+            return f"Invalid hour {hour!r}: use 0-23"
+        if not 0 <= hour <= 23:
+            return f"Invalid hour {hour}: use 0-23"
+        when = when or date.today()
+
+    today = date.today()
+    if when is not None and when < today:
+        return f"{when.isoformat()} is in the past; the forecast starts today ({today.isoformat()})."
+    needed = (when - today).days + 1 if when else FORECAST_DAYS
+    if needed > 16:
+        return f"{when.isoformat()} is too far ahead; forecasts cover at most 16 days."
+
+    forecast = fetch_forecast(city, needed)
+    if forecast is None:
+        return f"No forecast for {city}: coordinates not known (try New York, London, Tokyo, San Francisco, Seattle)."
+
+    if when is None:
+        return str(forecast)
+    if not forecast.covers(when):
+        return f"{when.isoformat()} is outside the forecast for {city} ({forecast.start} to {forecast.end - timedelta(days=1)})."
+    note = f" ({forecast.note})" if forecast.note else ""
+    if hour is not None:
+        return forecast.hour_summary(when, hour) + note
+    return f"{city} {forecast.day_summary(when)}{note}"
+
+
+if __name__ == "__main__":
+    # One upstream request per city; the day/hour questions below come from the cache
+    print(get_forecast("New York"))
+    print(get_forecast("New York", "tomorrow"))
+    print(get_forecast("New York", "tomorrow", 15))
+    print(get_forecast("London", datetime.now().strftime("%A")))
+    print(repr(fetch_forecast("Tokyo")))
@@ -0,0 +1,413 @@
+"""
+Append-only columnar history of every live quote and weather fetch.
+
+The daily cache forgets yesterday; this keeps it, to test the agent's
+"rain means bearish" premise on real observations. Tables are partitioned by
+symbol id / grid cell, and each partition is a directory with one raw binary
+file per column, appended in place and read back as NumPy memory maps, so
+scans over hundreds of millions of rows run as array operations without
+creating a Python object per row:
+
+    history/
+        quotes/<symbol_id>/   ts.f8  price.f8  change_pct.f4  volume.i8
+        weather/<cell_id>/    ts.f8  temperature.f4  weather_code.i2
+        symbols.txt   (line number = symbol_id)
+
+Reading one ticker or location only touches its own partition, and
+timestamps are kept non-decreasing within a partition, so a time range is a
+binary search (`np.searchsorted`) - no scan over other symbols' rows.
+
+Out-of-order appends: rows within one append are sorted by timestamp. A row
+older than the partition's last row (concurrent writers, a few ms apart) is
+stored at that last timestamp; one older by more than MAX_CLOCK_SKEW_SECONDS
+is rejected with ValueError - backfills belong in a fresh directory.
+
+NumPy is optional (`pip install stock-weather-agent[history]`); without it
+nothing is recorded and the tools work as before.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import HISTORY_DIR, HISTORY_ENABLED
+
+try:
+    import fcntl
+except ImportError:  # Windows - appends are then only serialized within a process
+    fcntl = None
+
+# Column name -> NumPy dtype, in file order
+QUOTE_COLUMNS = {"ts": "f8", "symbol_id": "i4", "price": "f8", "change_pct": "f4", "volume": "i8"}
+WEATHER_COLUMNS = {"ts": "f8", "cell_id": "i4", "temperature": "f4", "weather_code": "i2"}
+
+# Weather observations are keyed by grid cell, not city name (same grid as synthetic_data)
+CELL_DEGREES = 0.1
+
+# How far back of a partition's last timestamp a row may be and still be appended
+MAX_CLOCK_SKEW_SECONDS = 60.0
+
+
+def cell_id(lat: float, lon: float, cell_degrees: float = CELL_DEGREES) -> int:
+    """Grid cell containing the coordinates."""
+    row = int(math.floor((lat + 90) / cell_degrees))
+    col = int(math.floor((lon + 180) / cell_degrees))
+    return row * int(round(360 / cell_degrees)) + col
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exclusive lock across processes (flock on a lock file)."""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ColumnTable:
+    """
+    One append-only table: a raw file per column, read through memory maps.
+
+    Args:
+        directory: Where the column files live (created on first append)
+        columns: Column name -> NumPy dtype string; must include "ts"
+    """
+
+    def __init__(self, directory: Path, columns: dict[str, str]):
+        import numpy as np
+
+        self.np = np
+        self.directory = Path(directory)
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in columns.items()}
+        self._maps: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.{self.dtypes[name].str[1:]}"
+
+    def _rows_on_disk(self) -> int:
+        """Complete rows: the shortest column wins (a crash can leave a torn append)."""
+        rows = []
+        for name, dtype in self.dtypes.items():
+            try:
+                rows.append(os.path.getsize(self._path(name)) // dtype.itemsize)
+            except FileNotFoundError:
+                return 0
+        return min(rows)
+
+    def __len__(self) -> int:
+        return self._rows_on_disk()
+
+    def append(self, **columns) -> int:
+        """
+        Append rows (one array-like or scalar per column; scalars are repeated).
+
+        Returns:
+            The number of rows appended.
+
+        Raises:
+            ValueError: If the columns differ in length, or a row is more than
+                MAX_CLOCK_SKEW_SECONDS older than the last row on disk.
+        """
+        np = self.np
+        arrays = {name: np.atleast_1d(np.asarray(columns[name], dtype=dtype)) for name, dtype in self.dtypes.items()}
+        n = max(len(a) for a in arrays.values())
+        try:
+            arrays = {name: np.broadcast_to(a, (n,)) for name, a in arrays.items()}
+        except ValueError:
+            raise ValueError("all columns must have the same number of rows") from None
+        if n == 0:
+            return 0
+
+        # Keep time order so range scans can binary-search
+        order = np.argsort(arrays["ts"], kind="stable")
+        arrays = {name: a[order] for name, a in arrays.items()}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, _file_lock(self.directory / ".lock"):
+            rows = self._rows_on_disk()
+            if rows:
+                last = self.column("ts", rows)[-1]
+                ts = arrays["ts"]
+                if ts[0] < last - MAX_CLOCK_SKEW_SECONDS:
+                    raise ValueError(f"rows {last - ts[0]:.0f}s older than the table's last row")
+                if ts[0] < last:
+                    arrays["ts"] = np.maximum(ts, last)
+            for name, array in arrays.items():
+                with open(self._path(name), "ab") as f:
+                    # Drop any torn tail before appending so columns stay aligned
+                    f.truncate(rows * self.dtypes[name].itemsize)
+                    f.write(array.tobytes())
+        return n
+
+    def column(self, name: str, rows: int | None = None):
+        """Read-only memory map of a column (the first `rows` rows, default all)."""
+        np = self.np
+        rows = self._rows_on_disk() if rows is None else rows
+        if rows == 0:
+            return np.empty(0, dtype=self.dtypes[name])
+        mapped = self._maps.get(name)
+        if mapped is None or len(mapped) < rows:
+            # The file grew since we mapped it - map it again
+            mapped = np.memmap(self._path(name), dtype=self.dtypes[name], mode="r")
+            self._maps[name] = mapped
+        return mapped[:rows]
+
+    def time_slice(self, start: float | None = None, end: float | None = None, rows: int | None = None) -> slice:
+        """Row range with start <= ts < end, found by binary search."""
+        ts = self.column("ts", rows)
+        lo = 0 if start is None else int(ts.searchsorted(start, side="left"))
+        hi = len(ts) if end is None else int(ts.searchsorted(end, side="left"))
+        return slice(lo, hi)
+
+    def scan(self, key: str | None = None, value: int | None = None,
+             start: float | None = None, end: float | None = None) -> dict:
+        """
+        Rows in [start, end), optionally only those where column `key` == `value`.
+
+        Returns:
+            Column name -> array. Without a key filter the arrays are views
+            on the memory maps; with one they are compact copies.
+        """
+        rows = self._rows_on_disk()
+        window = self.time_slice(start, end, rows)
+        columns = {name: self.column(name, rows)[window] for name in self.dtypes}
+        if key is None:
+            return columns
+        mask = columns[key] == value
+        return {name: array[mask] for name, array in columns.items()}
+
+
+class PartitionedTable:
+    """
+    A table split by an integer key column: one ColumnTable per key value,
+    in a subdirectory named after it. The key itself is not stored.
+
+    Args:
+        directory: Parent directory of the partitions
+        columns: Column name -> NumPy dtype string; must include "ts" and `key`
+        key: The column to partition by (e.g. "symbol_id")
+    """
+
+    def __init__(self, directory: Path, columns: dict[str, str], key: str):
+        import numpy as np
+
+        self.np = np
+        self.directory = Path(directory)
+        self.key = key
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in columns.items()}
+        self._columns = {name: dtype for name, dtype in columns.items() if name != key}
+        self._parts: dict[int, ColumnTable] = {}
+        self._lock = threading.Lock()
+
+    def partition(self, value: int) -> ColumnTable:
+        """The table holding the rows where key == value (may be empty)."""
+        with self._lock:
+            part = self._parts.get(value)
+            if part is None:
+                part = self._parts[value] = ColumnTable(self.directory / str(value), self._columns)
+            return part
+
+    def keys(self) -> list[int]:
+        """Key values that have a partition on disk."""
+        try:
+            return sorted(int(p.name) for p in self.directory.iterdir() if p.name.isdigit())
+        except FileNotFoundError:
+            return []
+
+    def __len__(self) -> int:
+        return sum(len(self.partition(value)) for value in self.keys())
+
+    def append(self, **columns) -> int:
+        """
+        Append rows (one array-like or scalar per column; scalars are repeated).
+
+        Returns:
+            The number of rows appended.
+        """
+        np = self.np
+        arrays = {name: np.atleast_1d(np.asarray(columns[name], dtype=dtype)) for name, dtype in self.dtypes.items()}
+        n = max(len(a) for a in arrays.values())
+        try:
+            arrays = {name: np.broadcast_to(a, (n,)) for name, a in arrays.items()}
+        except ValueError:
+            raise ValueError("all columns must have the same number of rows") from None
+        keys = arrays.pop(self.key)
+        appended = 0
+        for value in np.unique(keys):
+            rows = keys == value
+            appended += self.partition(int(value)).append(**{name: a[rows] for name, a in arrays.items()})
+        return appended
+
+    def scan(self, value: int, start: float | None = None, end: float | None = None) -> dict:
+        """
+        Rows with key == value in [start, end).
+
+        Returns:
+            Column name -> array (views on the memory maps, plus the key
+            column filled in).
+        """
+        columns = self.partition(value).scan(start=start, end=end)
+        columns[self.key] = self.np.full(len(columns["ts"]), value, dtype=self.dtypes[self.key])
+        return columns
+
+
+class SymbolTable:
+    """Ticker <-> small integer id, persisted as one symbol per line."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._ids: dict[str, int] = {}
+        self._symbols: list[str] = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                symbols = f.read().splitlines()
+        except FileNotFoundError:
+            symbols = []
+        self._symbols = symbols
+        self._ids = {s: i for i, s in enumerate(symbols)}
+
+    def get(self, symbol: str) -> int | None:
+        """Id of a known symbol (None if never recorded)."""
+        if symbol not in self._ids:
+            self._load()  # Another process may have added it
+        return self._ids.get(symbol)
+
+    def id_for(self, symbol: str) -> int:
+        """Id of a symbol, assigning the next one if it is new."""
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is not None:
+            return symbol_id
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, _file_lock(self.path.with_name(".symbols.lock")):
+            self._load()
+            if symbol not in self._ids:
+                with open(self.path, "a") as f:
+                    f.write(symbol + "\n")
+                self._ids[symbol] = len(self._symbols)
+                self._symbols.append(symbol)
+            return self._ids[symbol]
+
+    def symbol(self, symbol_id: int) -> str:
+        if symbol_id >= len(self._symbols):
+            self._load()
+        return self._symbols[symbol_id]
+
+
+class HistoryStore:
+    """Quote and weather history under one directory."""
+
+    def __init__(self, directory: Path = HISTORY_DIR):
+        self.directory = Path(directory)
+        self.quotes = PartitionedTable(self.directory / "quotes", QUOTE_COLUMNS, "symbol_id")
+        self.weather = PartitionedTable(self.directory / "weather", WEATHER_COLUMNS, "cell_id")
+        self.symbols = SymbolTable(self.directory / "symbols.txt")
+
+    def record_quote(self, quote) -> None:
+        """Append one StockQuote."""
+        self.quotes.append(
+            ts=quote.fetched_at or time.time(),
+            symbol_id=self.symbols.id_for(quote.ticker),
+            price=quote.price,
+            change_pct=quote.change_pct,
+            volume=quote.volume or 0,
+        )
+
+    def record_weather(self, report, lat: float, lon: float) -> None:
+        """Append one WeatherReport observed at (lat, lon)."""
+        self.weather.append(
+            ts=report.fetched_at or time.time(),
+            cell_id=cell_id(lat, lon),
+            temperature=report.temperature,
+            weather_code=report.weather_code,
+        )
+
+    def quotes_for(self, symbol: str, start: float | None = None, end: float | None = None) -> dict:
+        """Quote history of one ticker in [start, end) as column arrays."""
+        symbol_id = self.symbols.get(symbol)
+        if symbol_id is None:
+            return {name: self.quotes.np.empty(0, dtype) for name, dtype in self.quotes.dtypes.items()}
+        return self.quotes.scan(symbol_id, start, end)
+
+    def weather_for(self, lat: float, lon: float, start: float | None = None, end: float | None = None) -> dict:
+        """Weather history of the grid cell containing (lat, lon) in [start, end)."""
+        return self.weather.scan(cell_id(lat, lon), start, end)
+
+
+_store = None
+
+
+def get_history_store() -> HistoryStore | None:
+    """Get or create the shared history store (None if disabled or NumPy is missing)."""
+    global _store
+    if _store is None and HISTORY_ENABLED:
+        try:
+            _store = HistoryStore()
+        except ImportError:
+            return None
+    return _store
+
+
+def record_quote(quote) -> None:
+    """Best-effort: record a live quote, never failing the tool call."""
+    store = get_history_store()
+    if store is not None:
+        try:
+            store.record_quote(quote)
+        except (OSError, TypeError, ValueError):
+            # TypeError: a quote/report with a missing (None) field
+            pass
+
+
+def record_weather(report, lat: float, lon: float) -> None:
+    """Best-effort: record a live weather observation, never failing the tool call."""
+    store = get_history_store()
+    if store is not None:
+        try:
+            store.record_weather(report, lat, lon)
+        except (OSError, TypeError, ValueError):
+            pass
+
+
+if __name__ == "__main__":
+    # Fill a scratch store with synthetic quotes and time a few scans
+    import tempfile
+
+    import numpy as np
+
+    n = 10_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(Path(tmp))
+        symbol_ids = [store.symbols.id_for(s) for s in ("AAPL", "MSFT", "NVDA", "GOOGL", "AMZN")]
+        rng = np.random.default_rng(0)
+        t0 = time.perf_counter()
+        for chunk in range(10):
+            m = n // 10
+            store.quotes.append(
+                ts=1.7e9 + np.arange(chunk * m, (chunk + 1) * m) * 0.5,
+                symbol_id=rng.choice(symbol_ids, m),
+                price=100 + rng.standard_normal(m).cumsum() * 0.01,
+                change_pct=rng.standard_normal(m),
+                volume=rng.integers(1_000, 1_000_000, m),
+            )
+        print(f"Appended {len(store.quotes):,} rows in {time.perf_counter() - t0:.2f}s")
+
+        t0 = time.perf_counter()
+        week = store.quotes_for("NVDA", 1.7e9 + 1e6, 1.7e9 + 1.1e6)
+        print(f"Time range for NVDA: {len(week['ts']):,} rows in {(time.perf_counter() - t0) * 1e6:.0f}µs")
+
+        t0 = time.perf_counter()
+        nvda = store.quotes_for("NVDA")
+        print(f"All of NVDA: {len(nvda['price']):,} rows, mean change {nvda['change_pct'].mean():+.3f}% "
+              f"in {time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,154 @@
+"""
+Compact encoding of tool results for the LLM.
+
+By default every tool result goes back to the model as its own sentence
+("Current price for AAPL: $178.72 (-0.45% change today)."). In the "table"
+format the results of one turn are packed into CSV blocks with one shared
+header per tool, which carries the same facts in fewer prompt tokens:
+
+    ticker,price,change_pct
+    AAPL,178.72,-0.45
+    MSFT,378.91,+0.32
+
+The format is picked per model (OBSERVATION_FORMAT / OBSERVATION_FORMATS in
+config), since small models may read sentences more reliably than tables.
+Results that are plain text (errors, unknown tools) are always sent as-is.
+
+Compare token counts and check the table against the records with:
+    python -m benchmarks.observation_encoding
+"""
+
+import csv
+import io
+import json
+import re
+
+from config import OBSERVATION_FORMAT, OBSERVATION_FORMATS
+from tools.results import StockQuote, WeatherReport
+
+FORMAT_TEXT = "text"
+FORMAT_TABLE = "table"
+
+# Tool messages whose result is already in the turn's table point back to it
+SEE_TABLE = "see above"
+
+STOCK_HEADER = ("ticker", "price", "change_pct")
+WEATHER_HEADER = ("city", "condition", "temp_c")
+
+# Rough BPE-style tokenization: words, numbers and single punctuation marks
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def observation_format(model: str) -> str:
+    """The observation format configured for a model ("text" or "table")."""
+    return OBSERVATION_FORMATS.get(model, OBSERVATION_FORMAT)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate prompt tokens for `text` (no tokenizer dependency)."""
+    return len(_TOKEN_RE.findall(text))
+
+
+def _stock_row(quote: StockQuote) -> list[str]:
+    return [quote.ticker, f"{quote.price:.2f}", f"{quote.change_pct:+.2f}"]
+
+
+def _weather_row(report: WeatherReport) -> list[str]:
+    return [report.city, "rainy" if report.is_rainy else report.condition, f"{report.temperature:.0f}"]
+
+
+def encode_table(records: list) -> str:
+    """
+    Encode StockQuote/WeatherReport records as CSV blocks, one per record type.
+
+    Notes (mock data, fallbacks) go in an extra "note" column, only when a
+    block has any.
+    """
+    blocks = []
+    for cls, header, row in ((WeatherReport, WEATHER_HEADER, _weather_row), (StockQuote, STOCK_HEADER, _stock_row)):
+        group = [r for r in records if isinstance(r, cls)]
+        if not group:
+            continue
+        with_notes = any(r.note for r in group)
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerow(header + ("note",) if with_notes else header)
+        for record in group:
+            writer.writerow(row(record) + [record.note or ""] if with_notes else row(record))
+        blocks.append(buf.getvalue().rstrip("\n"))
+    return "\n\n".join(blocks)
+
+
+def decode_table(text: str) -> list[dict]:
+    """Parse `encode_table` output back into one dict per row (used for round-trip checks)."""
+    rows = []
+    for block in text.split("\n\n"):
+        rows.extend(csv.DictReader(io.StringIO(block)))
+    return rows
+
+
+def _record(observation):
+    return getattr(observation, "record", None) or (
+        observation if isinstance(observation, (StockQuote, WeatherReport)) else None
+    )
+
+
+def encode_observations(observations: list[tuple[str, object]], fmt: str = FORMAT_TEXT) -> list[tuple[str, str]]:
+    """
+    Turn one turn's tool results into tool-message contents.
+
+    Args:
+        observations: (tool_call_id, result) pairs in call order; results are
+            tool outputs (`ToolText`), records, or plain strings
+        fmt: FORMAT_TEXT or FORMAT_TABLE
+
+    Returns:
+        (tool_call_id, content) pairs, one per observation. In table format
+        the first structured result carries the whole table and the other
+        structured results point to it - unless the sentences would be
+        shorter (a turn with one or two results), then text is used.
+    """
+    as_text = [(call_id, str(result)) for call_id, result in observations]
+    if fmt != FORMAT_TABLE:
+        return as_text
+
+    records = [_record(result) for _, result in observations]
+    structured = [r for r in records if r is not None]
+    if len(structured) < 2:
+        return as_text
+
+    table = encode_table(structured)
+    encoded, table_sent = [], False
+    for (call_id, result), record in zip(observations, records):
+        if record is None:
+            encoded.append((call_id, str(result)))
+        else:
+            encoded.append((call_id, SEE_TABLE if table_sent else table))
+            table_sent = True
+    if sum(estimate_tokens(c) for _, c in encoded) >= sum(estimate_tokens(c) for _, c in as_text):
+        return as_text
+    return encoded
+
+
+def format_tool_results(results: list[dict], fmt: str = FORMAT_TEXT) -> str:
+    """
+    Format the planning agent's executed steps for the synthesis prompt.
+
+    Args:
+        results: [{"tool": ..., "args": ..., "result": ...}, ...] as built in Phase 2
+        fmt: FORMAT_TEXT or FORMAT_TABLE
+
+    Returns:
+        A "- tool(args): result" line per step, or in table format one table
+        for all structured results plus a line for each plain-text result.
+    """
+    lines, records = [], []
+    for step in results:
+        record = _record(step["result"]) if fmt == FORMAT_TABLE else None
+        if record is not None:
+            records.append(record)
+        else:
+            lines.append(f"- {step['tool']}({json.dumps(step['args'])}): {step['result']}")
+    if records:
+        lines.insert(0, encode_table(records))
+    return "\n".join(lines)
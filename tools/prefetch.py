@@ -0,0 +1,220 @@
+"""
+Speculative tool prefetching from the raw user query.
+
+Most queries name their tickers and cities outright ("NVDA in NYC"), so we
+can start the tool calls while the first LLM call is still in flight. When
+the model then asks for the same tool, the agent takes the (usually already
+finished) result instead of fetching again.
+"""
+
+import contextvars
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from config import CITY_ALIASES, CITY_COORDINATES, DEFAULT_CITY, UPSTREAM_TIMEOUT, normalize_city
+from deadline import timeout_for
+from tools.stock_tool import get_stock_price
+from tools.ticker_index import get_ticker_index, normalize_symbol, resolve_ticker
+from tools.weather_tool import get_weather
+
+# Ticker-looking tokens: "NVDA", "$aapl", "BRK.B"
+_TICKER_TOKEN_RE = re.compile(r"(?<![\w$])(\$?)([A-Za-z]{1,5}(?:[./-][A-Za-z])?)(?![\w])")
+
+# Runs of capitalized words that might be a company name ("Goldman Sachs")
+_NAME_RUN_RE = re.compile(r"\b[A-Z][\w&'.-]*(?:\s+[A-Z][\w&'.-]*){0,2}")
+
+# Every city name and alias we can look up, longest first so "new york city"
+# wins over "new york" ("$SF" is a ticker, not a city)
+_CITY_NAMES = sorted(set(CITY_COORDINATES) | set(CITY_ALIASES), key=len, reverse=True)
+_CITY_RE = re.compile(r"(?<!\$)\b(" + "|".join(re.escape(c) for c in _CITY_NAMES) + r")\b", re.IGNORECASE)
+
+MAX_PREFETCH_WORKERS = 8
+
+
+def extract_tickers(query: str) -> list[str]:
+    """
+    Find the tickers a query mentions.
+
+    Upper-case tokens (or any `$`-prefixed token) that are listed symbols count,
+    as do capitalized company names ("Apple"), wherever they sit in a run of
+    capitalized words ("Is Apple up?"). Single letters need a `$` so words
+    like "I" or "A" are not mistaken for tickers, and a capitalized word that
+    only happens to be a symbol ("Meta", "Is") is not one either - see
+    `unresolved_names`.
+    """
+    index = get_ticker_index()
+    found = []
+    # City aliases can be listed symbols too ("NYC", "SF")
+    text = _CITY_RE.sub(",", query)
+
+    for dollar, token in _TICKER_TOKEN_RE.findall(text):
+        symbol = _listed_symbol(index, token, bool(dollar))
+        if symbol and symbol not in found:
+            found.append(symbol)
+
+    for run in _NAME_RUN_RE.findall(text):
+        for symbol in _match_names(index, run.split())[0]:
+            if symbol not in found:
+                found.append(symbol)
+
+    return found
+
+
+def _listed_symbol(index, token: str, dollar: bool = False) -> str | None:
+    """The listed symbol `token` spells, if it is written like a ticker (upper case, or after a `$`)."""
+    if not dollar and (token != token.upper() or len(token) < 2):
+        return None
+    symbol = normalize_symbol(token)
+    return symbol if symbol in index else None
+
+
+def _match_names(index, words: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Company names in a run of capitalized words: (symbols, words left over).
+
+    Every sub-span is tried, longest first ("Goldman Sachs" before "Goldman"),
+    skipping words an earlier match already took.
+    """
+    symbols = []
+    used = [False] * len(words)
+    for length in range(len(words), 0, -1):
+        for start in range(len(words) - length + 1):
+            if any(used[start:start + length]):
+                continue
+            symbol = index.find_by_name(" ".join(words[start:start + length]), allow_prefix=False)
+            if symbol:
+                used[start:start + length] = [True] * length
+                symbols.append(symbol)
+    return symbols, [word for word, taken in zip(words, used) if not taken]
+
+
+def unresolved_names(query: str) -> list[str]:
+    """
+    Capitalized words that are neither part of a known city, a company name
+    nor a ticker `extract_tickers` would take, so callers can tell a query
+    names something the extraction missed.
+
+    Names only match exactly, so a short form of a listed company is
+    unresolved ("Palantir" for "Palantir Technologies"), and so is a word
+    that is a symbol but not written like one ("Meta"). Sentence words
+    ("What", "How") come back too - callers filter their own stopwords.
+    """
+    index = get_ticker_index()
+    # Cut city names out so their words neither count nor join a company run
+    text = _CITY_RE.sub(",", query)
+    left = []
+    for run in _NAME_RUN_RE.findall(text):
+        for word in _match_names(index, run.split())[1]:
+            word = word.rstrip(".")
+            if word and not _listed_symbol(index, word):
+                left.append(word)
+    return left
+
+
+def extract_cities(query: str) -> list[str]:
+    """Find the known cities (including aliases like "NYC") a query mentions, normalized."""
+    found = []
+    for match in _CITY_RE.findall(query):
+        city = normalize_city(match)
+        if city not in found:
+            found.append(city)
+    return found
+
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get or create the shared prefetch thread pool."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_PREFETCH_WORKERS, thread_name_prefix="prefetch")
+    return _executor
+
+
+def tool_call_key(fn_name: str, fn_args: dict) -> tuple[str, str] | None:
+    """Canonical (tool, argument) key so "nvda"/"NVDA" and "NYC"/"New York" match."""
+    if fn_name == "get_stock_price":
+        ticker = fn_args.get("ticker")
+        if not ticker:
+            return None
+        return fn_name, resolve_ticker(ticker) or ticker.strip().upper()
+    if fn_name == "get_weather":
+        return fn_name, normalize_city(fn_args.get("city") or DEFAULT_CITY)
+    return None
+
+
+class Prefetcher:
+    """Starts likely tool calls for a query in the background and hands out their results."""
+
+    def __init__(self):
+        self._futures: dict[tuple[str, str], Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, query: str) -> "Prefetcher":
+        """
+        Extract entities from the query and submit their tool calls.
+
+        If the query names a ticker but no city, the default city's weather is
+        prefetched too - the agent is prompted to check it for every stock.
+        """
+        tickers = extract_tickers(query)
+        cities = extract_cities(query)
+        if tickers and not cities:
+            cities = [normalize_city(DEFAULT_CITY)]
+
+        # Each call runs in a copy of our context, so it sees the query's deadline
+        executor = get_executor()
+        for ticker in tickers:
+            self._futures[("get_stock_price", ticker)] = executor.submit(
+                contextvars.copy_context().run, get_stock_price, ticker
+            )
+        for city in cities:
+            self._futures[("get_weather", city)] = executor.submit(
+                contextvars.copy_context().run, get_weather, city.title()
+            )
+        return self
+
+    @property
+    def pending(self) -> list[tuple[str, str]]:
+        """Keys of the prefetches that have been started."""
+        return list(self._futures)
+
+    def take(self, fn_name: str, fn_args: dict) -> str | None:
+        """
+        Get the prefetched result for a tool call, waiting if it is still running
+        (at most UPSTREAM_TIMEOUT, capped at the query's remaining budget).
+
+        Returns:
+            The tool's result, or None if this call was not prefetched, failed
+            or is still running after the wait.
+        """
+        key = tool_call_key(fn_name, fn_args)
+        future = self._futures.get(key) if key else None
+        if future is None:
+            self.misses += 1
+            return None
+        try:
+            result = future.result(timeout=timeout_for(UPSTREAM_TIMEOUT))
+        except FutureTimeoutError:
+            # Still running: let the caller fetch it itself
+            self.misses += 1
+            return None
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+
+if __name__ == "__main__":
+    for q in [
+        "What's the outlook for NVDA in NYC?",
+        "Check $msft and the weather in New York",
+        "How are Apple and Goldman Sachs doing in London and SF?",
+        "Is Apple up?",
+        "I think BRK.B will drop if it rains in Seattle",
+    ]:
+        print(f"{q}\n  tickers={extract_tickers(q)} cities={extract_cities(q)}")
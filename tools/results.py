@@ -0,0 +1,339 @@
+"""
+Typed tool results.
+
+`fetch_stock_quote` and `fetch_weather` return these records; analytics and
+batch code read the fields directly. The English text the LLM sees is only
+built when the record is turned into a string, which is all the
+`get_stock_price` / `get_weather` tools do. Their return value is a
+`ToolText`: the rendered string, with the record still attached for code
+(like the observation encoder) that wants the numbers back.
+
+`Forecast` holds an hourly series as compact arrays and answers day/hour
+questions from it (see `tools/forecast_tool.py`).
+"""
+
+import base64
+import math
+import time
+from array import array
+from datetime import date, timedelta
+
+# WMO Weather interpretation codes
+# https://open-meteo.com/en/docs
+WMO_CODES = {
+    0: "clear sky",
+    1: "mainly clear",
+    2: "partly cloudy",
+    3: "overcast",
+    45: "foggy",
+    48: "depositing rime fog",
+    51: "light drizzle",
+    53: "moderate drizzle",
+    55: "dense drizzle",
+    61: "slight rain",
+    63: "moderate rain",
+    65: "heavy rain",
+    66: "light freezing rain",
+    67: "heavy freezing rain",
+    71: "slight snow",
+    73: "moderate snow",
+    75: "heavy snow",
+    77: "snow grains",
+    80: "slight rain showers",
+    81: "moderate rain showers",
+    82: "violent rain showers",
+    85: "slight snow showers",
+    86: "heavy snow showers",
+    95: "thunderstorm",
+    96: "thunderstorm with slight hail",
+    99: "thunderstorm with heavy hail",
+}
+
+# Weather codes that indicate rain
+RAIN_CODES = {51, 53, 55, 61, 63, 65, 66, 67, 80, 81, 82, 95, 96, 99}
+
+# Where a result came from
+SOURCE_LIVE = "live"
+SOURCE_CACHE = "cache"
+SOURCE_MOCK = "mock"
+
+
+class StockQuote:
+    """One stock quote. `str()` renders it for the LLM."""
+
+    __slots__ = ("ticker", "price", "change_pct", "day_low", "day_high", "volume", "source", "fetched_at", "note")
+
+    def __init__(
+        self,
+        ticker: str,
+        price: float,
+        change_pct: float,
+        day_low: float | None = None,
+        day_high: float | None = None,
+        volume: int | None = None,
+        source: str = SOURCE_LIVE,
+        fetched_at: float | None = None,
+        note: str | None = None,
+    ):
+        self.ticker = ticker
+        self.price = price
+        self.change_pct = change_pct
+        self.day_low = day_low
+        self.day_high = day_high
+        self.volume = volume
+        self.source = source
+        self.fetched_at = fetched_at
+        self.note = note
+
+    @classmethod
+    def from_quote(cls, ticker: str, data: dict, source: str, note: str | None = None) -> "StockQuote":
+        """
+        Build from an FMP-shaped quote dict (live, cached or mock).
+
+        Args:
+            ticker: Normalized ticker symbol
+            data: Quote dict ("price", "changesPercentage", "dayLow", ...);
+                entries without "fetched_at" get None (age unknown)
+            source: SOURCE_LIVE, SOURCE_CACHE or SOURCE_MOCK
+            note: Extra remark appended to the text (e.g. a fallback reason)
+        """
+        return cls(
+            ticker,
+            data.get("price", 0),
+            data.get("changesPercentage", data.get("changePercentage", 0)),
+            data.get("dayLow"),
+            data.get("dayHigh"),
+            data.get("volume"),
+            source,
+            data.get("fetched_at"),
+            note,
+        )
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __str__(self) -> str:
+        direction = "+" if self.change_pct >= 0 else ""
+        text = f"Current price for {self.ticker}: ${self.price:.2f} ({direction}{self.change_pct:.2f}% change today)."
+        return f"{text} ({self.note})" if self.note else text
+
+    def __repr__(self) -> str:
+        return f"StockQuote({self.ticker!r}, price={self.price}, change_pct={self.change_pct}, source={self.source!r})"
+
+
+class WeatherReport:
+    """Current weather for one city. `str()` renders it for the LLM."""
+
+    __slots__ = ("city", "temperature", "weather_code", "condition", "is_rainy", "source", "fetched_at", "note")
+
+    def __init__(
+        self,
+        city: str,
+        temperature: float,
+        weather_code: int,
+        condition: str | None = None,
+        source: str = SOURCE_LIVE,
+        fetched_at: float | None = None,
+        note: str | None = None,
+    ):
+        self.city = city
+        self.temperature = temperature
+        self.weather_code = weather_code
+        self.condition = condition or WMO_CODES.get(weather_code, "unknown")
+        self.is_rainy = weather_code in RAIN_CODES or "rain" in self.condition.lower()
+        self.source = source
+        self.fetched_at = fetched_at
+        self.note = note
+
+    @classmethod
+    def from_observation(cls, city: str, data: dict, source: str, note: str | None = None) -> "WeatherReport":
+        """
+        Build from a weather dict as cached by the tool ("temperature", "weather_code").
+
+        Args:
+            city: City name as asked for
+            data: Observation dict (live, cached or mock); entries without
+                "fetched_at" get None (age unknown)
+            source: SOURCE_LIVE, SOURCE_CACHE or SOURCE_MOCK
+            note: Extra remark appended to the text (e.g. a fallback reason)
+        """
+        return cls(
+            city,
+            data.get("temperature", 20),
+            data.get("weather_code", 0),
+            data.get("condition"),
+            source,
+            data.get("fetched_at"),
+            note,
+        )
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __str__(self) -> str:
+        condition = "rainy" if self.is_rainy else self.condition
+        text = f"The weather in {self.city} is {condition} with a temperature of {self.temperature:.0f}°C."
+        return f"{text} ({self.note})" if self.note else text
+
+    def __repr__(self) -> str:
+        return (
+            f"WeatherReport({self.city!r}, temperature={self.temperature}, "
+            f"weather_code={self.weather_code}, source={self.source!r})"
+        )
+
+
+def _hour_ranges(hours: list[int]) -> str:
+    """[9, 10, 11, 16] -> "09:00-12:00, 16:00-17:00"."""
+    ranges, start = [], None
+    for i, hour in enumerate(hours):
+        if start is None:
+            start = hour
+        if i + 1 == len(hours) or hours[i + 1] != hour + 1:
+            ranges.append(f"{start:02d}:00-{hour + 1:02d}:00")
+            start = None
+    return ", ".join(ranges)
+
+
+class Forecast:
+    """
+    Hourly forecast for one location, held as flat arrays (24 values per day).
+
+    `str()` renders a day-by-day summary; `day_summary`, `hour`, `rain_hours`
+    and `is_rainy` answer narrower questions from the same series.
+    """
+
+    __slots__ = ("city", "start", "temperature", "precipitation_probability", "weather_code", "source", "fetched_at", "note")
+
+    def __init__(
+        self,
+        city: str,
+        start: date,
+        temperature: array,
+        precipitation_probability: array,
+        weather_code: array,
+        source: str = SOURCE_LIVE,
+        fetched_at: float | None = None,
+        note: str | None = None,
+    ):
+        self.city = city
+        self.start = start
+        self.temperature = temperature
+        self.precipitation_probability = precipitation_probability
+        self.weather_code = weather_code
+        self.source = source
+        self.fetched_at = fetched_at
+        self.note = note
+
+    @classmethod
+    def from_hourly(cls, city: str, hourly: dict, source: str, note: str | None = None) -> "Forecast":
+        """Build from an Open-Meteo "hourly" block (missing values become 0 / NaN)."""
+        return cls(
+            city,
+            date.fromisoformat(hourly["time"][0][:10]),
+            array("f", [math.nan if v is None else v for v in hourly["temperature_2m"]]),
+            array("B", [v or 0 for v in hourly["precipitation_probability"]]),
+            array("B", [v or 0 for v in hourly["weather_code"]]),
+            source,
+            time.time(),
+            note,
+        )
+
+    def to_cache(self) -> dict:
+        """Cache entry: the arrays as base64 bytes (a fraction of the size of JSON lists)."""
+        return {
+            "start": self.start.isoformat(),
+            "temperature": base64.b64encode(self.temperature.tobytes()).decode(),
+            "precipitation_probability": base64.b64encode(self.precipitation_probability.tobytes()).decode(),
+            "weather_code": base64.b64encode(self.weather_code.tobytes()).decode(),
+            "fetched_at": self.fetched_at,
+        }
+
+    @classmethod
+    def from_cache(cls, city: str, data: dict, source: str = SOURCE_CACHE) -> "Forecast":
+        columns = []
+        for name, typecode in (("temperature", "f"), ("precipitation_probability", "B"), ("weather_code", "B")):
+            column = array(typecode)
+            column.frombytes(base64.b64decode(data[name]))
+            columns.append(column)
+        return cls(city, date.fromisoformat(data["start"]), *columns, source, data.get("fetched_at"))
+
+    @property
+    def days(self) -> int:
+        return len(self.weather_code) // 24
+
+    @property
+    def end(self) -> date:
+        """First day not covered."""
+        return self.start + timedelta(days=self.days)
+
+    def covers(self, day: date) -> bool:
+        return self.start <= day < self.end
+
+    def _slice(self, day: date) -> slice:
+        if not self.covers(day):
+            raise ValueError(f"{day.isoformat()} is outside the forecast ({self.start} to {self.end - timedelta(days=1)})")
+        first = (day - self.start).days * 24
+        return slice(first, first + 24)
+
+    def hour(self, day: date, hour: int) -> dict:
+        """Conditions for one hour: temperature, precipitation_probability, weather_code, is_rainy."""
+        i = self._slice(day).start + hour
+        code = self.weather_code[i]
+        return {
+            "temperature": self.temperature[i],
+            "precipitation_probability": self.precipitation_probability[i],
+            "weather_code": code,
+            "is_rainy": code in RAIN_CODES,
+        }
+
+    def rain_hours(self, day: date) -> list[int]:
+        """Hours of `day` with a rain weather code."""
+        codes = self.weather_code[self._slice(day)]
+        return [hour for hour, code in enumerate(codes) if code in RAIN_CODES]
+
+    def is_rainy(self, day: date) -> bool:
+        """Daily rain flag: any rain hour."""
+        return bool(self.rain_hours(day))
+
+    def day_summary(self, day: date) -> str:
+        window = self._slice(day)
+        temps = [t for t in self.temperature[window] if not math.isnan(t)]
+        temp_range = f"{min(temps):.0f} to {max(temps):.0f}°C" if temps else "temperature unknown"
+        rain = self.rain_hours(day)
+        max_precip = max(self.precipitation_probability[window])
+        label = f"{day.strftime('%a')} {day.isoformat()}"
+        if rain:
+            return f"{label}: rain {_hour_ranges(rain)} (up to {max_precip}% chance), {temp_range}"
+        codes = list(self.weather_code[window])
+        condition = WMO_CODES.get(max(set(codes), key=codes.count), "unknown")
+        return f"{label}: dry, mostly {condition} (max {max_precip}% chance of precipitation), {temp_range}"
+
+    def hour_summary(self, day: date, hour: int) -> str:
+        h = self.hour(day, hour)
+        condition = "rain" if h["is_rainy"] else WMO_CODES.get(h["weather_code"], "unknown")
+        return (
+            f"{self.city} at {hour:02d}:00 on {day.strftime('%a')} {day.isoformat()}: {condition}, "
+            f"{h['temperature']:.0f}°C, {h['precipitation_probability']}% chance of precipitation."
+        )
+
+    def __str__(self) -> str:
+        lines = [f"Hourly forecast for {self.city}, {self.days} days:"]
+        lines += [f"- {self.day_summary(self.start + timedelta(days=d))}" for d in range(self.days)]
+        if self.note:
+            lines.append(f"({self.note})")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"Forecast({self.city!r}, start={self.start}, days={self.days}, source={self.source!r})"
+
+
+class ToolText(str):
+    """Rendered tool output that keeps the record it came from in `.record`."""
+
+    record = None
+
+    @classmethod
+    def render(cls, record) -> "ToolText":
+        text = cls(str(record))
+        text.record = record
+        return text
@@ -1,85 +1,113 @@
 """Stock price tool using Financial Modeling Prep API with caching."""
 
-import json
+import time
 from datetime import date
-from pathlib import Path
 
 import requests
 
-from config import CACHE_DIR, FMP_API_KEY, USE_MOCK_STOCK
+from config import FMP_API_KEY, FMP_BASE_URL, USE_MOCK_STOCK
+from deadline import budget_low
 from mock_data import get_mock_stock
+from tools import upstream
+from tools.cache import get_cache_backend, get_stale
+from tools.history import record_quote
+from tools.results import SOURCE_CACHE, SOURCE_LIVE, SOURCE_MOCK, StockQuote, ToolText
+from tools.ticker_index import resolve_ticker
 
 
-def get_stock_price(ticker: str) -> str:
+def fetch_stock_quote(ticker: str) -> StockQuote | None:
     """
-    Get current stock price for a ticker symbol.
+    Get the current quote for a ticker symbol as a typed record.
 
     Args:
-        ticker: Stock ticker symbol (e.g., "AAPL", "MSFT")
+        ticker: Stock ticker symbol (e.g., "AAPL", "MSFT", "BRK.B") or company name
 
     Returns:
-        A formatted string with the current price and daily change.
+        A StockQuote (source "live", "cache" or "mock"), or None if the
+        ticker is not a listed symbol or company name.
     """
-    ticker = ticker.upper().strip()
+    # Validate against the local symbol universe - no network call for unknown tickers
+    ticker = resolve_ticker(ticker)
+    if ticker is None:
+        return None
     today = date.today().isoformat()
-    cache_file = CACHE_DIR / f"stock_{ticker}_{today}.json"
+    cache_key = f"stock_{ticker}_{today}"
+    cache = get_cache_backend()
 
     # Check cache first
-    if cache_file.exists():
-        try:
-            with open(cache_file) as f:
-                data = json.load(f)
-                return _format_stock_response(ticker, data)
-        except (json.JSONDecodeError, KeyError):
-            pass  # Cache corrupted, fetch fresh data
+    data = cache.get(cache_key)
+    if data is not None:
+        return StockQuote.from_quote(ticker, data, SOURCE_CACHE)
 
     # Use mock data if no API key
     if USE_MOCK_STOCK:
-        data = get_mock_stock(ticker)
-        _save_to_cache(cache_file, data)
-        return _format_stock_response(ticker, data) + " (mock data)"
+        data = {**get_mock_stock(ticker), "fetched_at": time.time()}
+        cache.set(cache_key, data)
+        return StockQuote.from_quote(ticker, data, SOURCE_MOCK, "mock data")
+
+    # Too little of the query's latency budget left to wait on FMP
+    if budget_low():
+        return _degraded_quote(ticker)
+
+    # Only one process/thread fetches a given ticker; the rest wait for its cache entry
+    with cache.lock(cache_key):
+        data = cache.get(cache_key)
+        if data is not None:
+            return StockQuote.from_quote(ticker, data, SOURCE_CACHE)
+        return _fetch_stock_quote(ticker, cache_key)
 
-    # Fetch from FMP API
+
+def get_stock_price(ticker: str) -> str:
+    """
+    Get current stock price for a ticker symbol.
+
+    Args:
+        ticker: Stock ticker symbol (e.g., "AAPL", "MSFT", "BRK.B") or company name
+
+    Returns:
+        A formatted string with the current price and daily change.
+    """
+    quote = fetch_stock_quote(ticker)
+    if quote is None:
+        return (
+            f"Unknown ticker '{ticker.strip()}'. It is not a listed symbol or company name - "
+            "please check the spelling and use a valid ticker (e.g., 'AAPL')."
+        )
+    return ToolText.render(quote)
+
+
+def _fetch_stock_quote(ticker: str, cache_key: str) -> StockQuote | None:
+    """Fetch a quote from the FMP API and cache it."""
     try:
-        url = "https://financialmodelingprep.com/stable/quote"
+        url = f"{FMP_BASE_URL}/stable/quote"
         params = {"symbol": ticker, "apikey": FMP_API_KEY}
-        response = requests.get(url, params=params, timeout=10)
+        response = upstream.get(url, params, "fmp")
         response.raise_for_status()
 
         result = response.json()
         if not result or len(result) == 0:
-            # Ticker not found, use mock data
-            data = get_mock_stock(ticker)
-            return f"Ticker {ticker} not found. Using estimated data: " + _format_stock_response(ticker, data)
+            # Listed locally but FMP has no quote (e.g. delisted since the universe was built)
+            return None
 
-        data = result[0]
-        _save_to_cache(cache_file, data)
-        return _format_stock_response(ticker, data)
+        data = {**result[0], "fetched_at": time.time()}
+        get_cache_backend().set(cache_key, data)
+        quote = StockQuote.from_quote(ticker, data, SOURCE_LIVE)
+        record_quote(quote)
+        return quote
 
     except requests.RequestException as e:
         # API error, fall back to mock data
         data = get_mock_stock(ticker)
-        return _format_stock_response(ticker, data) + f" (fallback due to API error: {e})"
+        return StockQuote.from_quote(ticker, data, SOURCE_MOCK, f"fallback due to API error: {e}")
 
 
-def _format_stock_response(ticker: str, data: dict) -> str:
-    """Format stock data into a human-readable string."""
-    price = data.get("price", 0)
-    change_pct = data.get("changesPercentage", 0)
-
-    # Format the change direction
-    direction = "+" if change_pct >= 0 else ""
-
-    return f"Current price for {ticker}: ${price:.2f} ({direction}{change_pct:.2f}% change today)."
-
-
-def _save_to_cache(cache_file: Path, data: dict) -> None:
-    """Save data to cache file."""
-    try:
-        with open(cache_file, "w") as f:
-            json.dump(data, f, indent=2)
-    except IOError:
-        pass  # Silently fail on cache write errors
+def _degraded_quote(ticker: str) -> StockQuote:
+    """An earlier day's cached quote, or mock data if there is none."""
+    stale = get_stale(get_cache_backend(), f"stock_{ticker}")
+    if stale is not None:
+        data, day = stale
+        return StockQuote.from_quote(ticker, data, SOURCE_CACHE, f"quote from {day}, no time to refresh")
+    return StockQuote.from_quote(ticker, get_mock_stock(ticker), SOURCE_MOCK, "estimated data, no time to fetch")
 
 
 if __name__ == "__main__":
@@ -87,3 +115,4 @@ if __name__ == "__main__":
     print(get_stock_price("AAPL"))
     print(get_stock_price("NVDA"))
     print(get_stock_price("MSFT"))
+    print(repr(fetch_stock_quote("MSFT")))
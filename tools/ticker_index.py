@@ -0,0 +1,178 @@
+"""Local ticker universe for validating and normalizing symbols before any fetch."""
+
+import csv
+import re
+from bisect import bisect_left
+from pathlib import Path
+
+from config import TICKER_UNIVERSE_FILE
+
+# Share-class symbols come in many spellings: BRK.B, BRK/B, BRK B, brk-b.
+# FMP uses the dash form, so that is our canonical spelling.
+_SHARE_CLASS_RE = re.compile(r"^([A-Z]{1,5})[.\-/ ]([A-Z])$")
+_SYMBOL_RE = re.compile(r"^[A-Z][A-Z0-9]{0,5}(-[A-Z])?$")
+
+# Words dropped from company names so "Apple", "Apple Inc" and "apple inc."
+# all map to the same key
+_NAME_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "company", "co", "plc",
+    "ltd", "limited", "holding", "holdings", "group", "nv", "sa", "the",
+}
+_CLASS_RE = re.compile(r"\bclass ([a-z])\b")
+
+# Shorter partial names are too ambiguous to resolve ("met", "app", ...)
+MIN_PREFIX_LENGTH = 4
+
+
+def normalize_symbol(text: str) -> str:
+    """Canonicalize a ticker spelling (e.g. " $brk.b " -> "BRK-B")."""
+    symbol = text.strip().upper().lstrip("$")
+    match = _SHARE_CLASS_RE.match(symbol)
+    if match:
+        return f"{match.group(1)}-{match.group(2)}"
+    return symbol
+
+
+def normalize_name(text: str) -> str:
+    """
+    Reduce a company name to a lookup key (e.g. "The Walt Disney Company" -> "walt disney").
+
+    A share class stays part of the key, at the end: "Alphabet Inc. Class A"
+    -> "alphabet class a".
+    """
+    name = text.lower().replace("&", " and ").replace("'s", "s")
+    share_class = _CLASS_RE.search(name)
+    if share_class:
+        name = name[:share_class.start()] + " " + name[share_class.end():]
+    words = re.sub(r"[^a-z0-9 ]", " ", name).split()
+    while words and words[-1] in _NAME_SUFFIXES:
+        words.pop()
+    while words and words[0] in _NAME_SUFFIXES:
+        words.pop(0)
+    if share_class and words:
+        words += ["class", share_class.group(1)]
+    return " ".join(words)
+
+
+class TickerIndex:
+    """
+    Sorted, read-only index over a symbol universe.
+
+    Symbols and normalized company names are kept in sorted tuples and
+    searched with bisect, so lookups stay O(log n) and the whole index
+    is a handful of flat tuples even for tens of thousands of listings.
+    """
+
+    def __init__(self, listings: list[tuple[str, str]]):
+        by_symbol = {}
+        for symbol, name in listings:
+            by_symbol.setdefault(normalize_symbol(symbol), name.strip())
+        self._symbols = tuple(sorted(by_symbol))
+        self._names = tuple(by_symbol[s] for s in self._symbols)
+
+        # First listing wins when two share a name key
+        by_name = {}
+        lowest_class = {}  # company name without the class -> (class letter, symbol)
+        for symbol, name in listings:
+            key = normalize_name(name)
+            if not key:
+                continue
+            symbol = normalize_symbol(symbol)
+            by_name.setdefault(key, symbol)
+            base, _, share_class = key.rpartition(" class ")
+            if base and (base not in lowest_class or share_class < lowest_class[base][0]):
+                lowest_class[base] = (share_class, symbol)
+        # A bare company name means its lowest listed class ("Alphabet" -> GOOGL, Class A)
+        for base, (_, symbol) in lowest_class.items():
+            by_name.setdefault(base, symbol)
+        self._name_keys = tuple(sorted(by_name))
+        self._name_symbols = tuple(by_name[k] for k in self._name_keys)
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "TickerIndex":
+        """Load a universe from a CSV file with `symbol,name` columns."""
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            return cls([(row["symbol"], row.get("name") or "") for row in reader])
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return self._find_symbol(normalize_symbol(symbol)) is not None
+
+    def _find_symbol(self, symbol: str) -> int | None:
+        i = bisect_left(self._symbols, symbol)
+        if i < len(self._symbols) and self._symbols[i] == symbol:
+            return i
+        return None
+
+    def company_name(self, symbol: str) -> str | None:
+        """Get the listed company name for a symbol."""
+        i = self._find_symbol(normalize_symbol(symbol))
+        return self._names[i] if i is not None else None
+
+    def find_by_name(self, name: str, allow_prefix: bool = True) -> str | None:
+        """
+        Find a ticker by company name.
+
+        An exact (normalized) name match wins; otherwise a prefix is accepted
+        only when it points at exactly one company (and `allow_prefix` is set).
+        """
+        key = normalize_name(name)
+        if not key:
+            return None
+
+        i = bisect_left(self._name_keys, key)
+        if i < len(self._name_keys) and self._name_keys[i] == key:
+            return self._name_symbols[i]
+        if not allow_prefix or len(key) < MIN_PREFIX_LENGTH:
+            return None
+
+        matches = set()
+        while i < len(self._name_keys) and self._name_keys[i].startswith(key):
+            # Class-specific names only match exactly; their bare name stands in for them
+            if " class " not in self._name_keys[i][len(key):]:
+                matches.add(self._name_symbols[i])
+            i += 1
+        return matches.pop() if len(matches) == 1 else None
+
+    def resolve(self, query: str) -> str | None:
+        """
+        Resolve a ticker or company name to a canonical listed symbol.
+
+        Args:
+            query: A ticker in any common spelling ("brk.b", "$NVDA") or a
+                   company name ("Apple", "Goldman Sachs")
+
+        Returns:
+            The canonical symbol, or None if the universe has no match.
+        """
+        symbol = normalize_symbol(query)
+        if _SYMBOL_RE.match(symbol) and self._find_symbol(symbol) is not None:
+            return symbol
+        return self.find_by_name(query)
+
+
+_index = None
+
+
+def get_ticker_index() -> TickerIndex:
+    """Get or load the global ticker index."""
+    global _index
+    if _index is None:
+        _index = TickerIndex.from_csv(TICKER_UNIVERSE_FILE)
+    return _index
+
+
+def resolve_ticker(query: str) -> str | None:
+    """Resolve a ticker or company name against the local universe (see `TickerIndex.resolve`)."""
+    return get_ticker_index().resolve(query)
+
+
+if __name__ == "__main__":
+    index = get_ticker_index()
+    print(f"{len(index)} symbols loaded from {TICKER_UNIVERSE_FILE}")
+    for q in ["aapl", "BRK.B", "brk/a", "$nvda", "Apple", "goldman sachs", "Walt Disney", "MICRO", "XYZQ",
+              "Alphabet", "Alphabet Inc. Class C", "Berkshire Hathaway Class B"]:
+        print(f"  {q!r:>30} -> {index.resolve(q)}")
@@ -0,0 +1,173 @@
+"""
+HTTP GETs to the upstream APIs (FMP, Open-Meteo), bounded and hedged.
+
+Every request's timeout is UPSTREAM_TIMEOUT capped at the query's remaining
+budget (see `deadline.py`). Tail latency is cut with hedging: each upstream
+keeps a window of recent successful latencies, and once a request has run
+longer than their HEDGE_PERCENTILE (p95 by default) a duplicate is sent. The
+first successful response wins; the slower request is left to finish (or
+time out) in the background. Only about 1 in 20 requests is hedged, so the
+extra upstream load stays around 5%.
+
+HTTP error statuses count as failures here, so a fast 500 from one copy
+does not beat a good response from the other.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from config import HEDGE_ENABLED, HEDGE_MIN_SAMPLES, HEDGE_PERCENTILE, UPSTREAM_TIMEOUT
+from deadline import remaining, timeout_for
+from model_router import percentile
+
+# Recent latencies kept per upstream for the hedge delay
+LATENCY_WINDOW = 200
+
+MAX_UPSTREAM_WORKERS = 32
+
+
+class UpstreamStats:
+    """Recent latencies and hedge counters for one upstream API."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def count(self, name: str) -> None:
+        """Add one to a counter ("requests", "hedged", "hedge_wins"); callers run on many threads."""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def hedge_delay(self) -> float | None:
+        """How long to wait before hedging (None until there are enough samples)."""
+        with self._lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            return percentile(list(self.latencies), HEDGE_PERCENTILE)
+
+    def report(self) -> str:
+        values = list(self.latencies)
+        return (
+            f"  {self.name}: {self.requests} requests, "
+            f"p50 {percentile(values, 50) * 1000:.0f} ms, p95 {percentile(values, 95) * 1000:.0f} ms, "
+            f"{self.hedged} hedged ({self.hedge_wins} won by the hedge)"
+        )
+
+
+UPSTREAM_STATS: dict[str, UpstreamStats] = {}
+_stats_lock = threading.Lock()
+
+
+def stats_for(upstream: str) -> UpstreamStats:
+    with _stats_lock:
+        if upstream not in UPSTREAM_STATS:
+            UPSTREAM_STATS[upstream] = UpstreamStats(upstream)
+        return UPSTREAM_STATS[upstream]
+
+
+def upstream_report() -> str:
+    """Latency and hedging summary for every upstream called so far ("" if none)."""
+    if not UPSTREAM_STATS:
+        return ""
+    return "\n".join(["Upstream requests:"] + [s.report() for s in UPSTREAM_STATS.values()])
+
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get or create the shared pool for hedged requests."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_UPSTREAM_WORKERS, thread_name_prefix="upstream")
+    return _executor
+
+
+def _timed_get(stats: UpstreamStats, url: str, params: dict, timeout: float) -> requests.Response:
+    start = time.perf_counter()
+    response = requests.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    stats.record(time.perf_counter() - start)
+    return response
+
+
+def get(url: str, params: dict, upstream: str) -> requests.Response:
+    """
+    GET `url` within the query's budget, hedging slow requests.
+
+    Args:
+        url: Request URL
+        params: Query parameters
+        upstream: Name the latency window is kept under (e.g. "fmp", "open-meteo")
+
+    Returns:
+        The first successful response.
+
+    Raises:
+        requests.RequestException: If every attempt failed (the last error).
+    """
+    stats = stats_for(upstream)
+    stats.count("requests")
+    timeout = timeout_for(UPSTREAM_TIMEOUT)
+    delay = stats.hedge_delay() if HEDGE_ENABLED else None
+    if delay is None or delay >= timeout:
+        return _timed_get(stats, url, params, timeout)
+
+    executor = get_executor()
+    primary = executor.submit(contextvars.copy_context().run, _timed_get, stats, url, params, timeout)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    # Past the upstream's usual latency: send a duplicate, take whichever succeeds first
+    left = remaining()
+    hedge_timeout = timeout - delay if left is None else max(0.1, min(timeout - delay, left))
+    stats.count("hedged")
+    hedge = executor.submit(contextvars.copy_context().run, _timed_get, stats, url, params, hedge_timeout)
+    pending, error = {primary, hedge}, None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except requests.RequestException as e:
+                error = e
+                continue
+            if future is hedge:
+                stats.count("hedge_wins")
+            return response
+    raise error
+
+
+if __name__ == "__main__":
+    # Hedging against the mock server's lognormal latency, e.g.
+    #   python mock_server.py --port 8765 --latency lognormal:80,0.8
+    #   OPEN_METEO_BASE_URL=http://127.0.0.1:8765 python -m tools.upstream
+    from config import OPEN_METEO_BASE_URL
+
+    url = f"{OPEN_METEO_BASE_URL}/v1/forecast"
+    params = {"latitude": 40.71, "longitude": -74.01, "current": "temperature_2m"}
+    totals = []
+    for _ in range(200):
+        start = time.perf_counter()
+        try:
+            get(url, params, "open-meteo")
+        except requests.RequestException as e:
+            print(f"failed: {e}")
+        totals.append(time.perf_counter() - start)
+    print(upstream_report())
+    print(f"  end-to-end: p50 {percentile(totals, 50) * 1000:.0f} ms, p95 {percentile(totals, 95) * 1000:.0f} ms, "
+          f"p99 {percentile(totals, 99) * 1000:.0f} ms")
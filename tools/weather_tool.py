@@ -1,93 +1,96 @@
 """Weather forecast tool using Open-Meteo API with caching."""
 
-import json
+import time
 from datetime import date
-from pathlib import Path
 
 import requests
 
-from config import CACHE_DIR, DEFAULT_CITY, get_city_coordinates
+from config import DEFAULT_CITY, OPEN_METEO_BASE_URL, get_city_coordinates, normalize_city
+from deadline import budget_low
 from mock_data import get_mock_weather
+from tools import upstream
+from tools.cache import get_cache_backend, get_stale
+from tools.history import record_weather
+from tools.results import SOURCE_CACHE, SOURCE_LIVE, SOURCE_MOCK, ToolText, WeatherReport
 
-# WMO Weather interpretation codes
-# https://open-meteo.com/en/docs
-WMO_CODES = {
-    0: "clear sky",
-    1: "mainly clear",
-    2: "partly cloudy",
-    3: "overcast",
-    45: "foggy",
-    48: "depositing rime fog",
-    51: "light drizzle",
-    53: "moderate drizzle",
-    55: "dense drizzle",
-    61: "slight rain",
-    63: "moderate rain",
-    65: "heavy rain",
-    66: "light freezing rain",
-    67: "heavy freezing rain",
-    71: "slight snow",
-    73: "moderate snow",
-    75: "heavy snow",
-    77: "snow grains",
-    80: "slight rain showers",
-    81: "moderate rain showers",
-    82: "violent rain showers",
-    85: "slight snow showers",
-    86: "heavy snow showers",
-    95: "thunderstorm",
-    96: "thunderstorm with slight hail",
-    99: "thunderstorm with heavy hail",
-}
-
-# Weather codes that indicate rain
-RAIN_CODES = {51, 53, 55, 61, 63, 65, 66, 67, 80, 81, 82, 95, 96, 99}
+# The WMO tables live in tools.results now; re-exported for existing imports
+from tools.results import RAIN_CODES, WMO_CODES  # noqa: F401
 
 
-def get_weather(city: str = DEFAULT_CITY) -> str:
+def fetch_weather(city: str = DEFAULT_CITY) -> WeatherReport:
     """
-    Get current weather for a city.
+    Get current weather for a city as a typed record.
 
     Args:
         city: City name (default: "New York")
-              Supported cities: New York, London, Tokyo, San Francisco, Seattle
 
     Returns:
-        A formatted string with the current weather conditions.
+        A WeatherReport (source "live", "cache" or "mock").
     """
     city = city.strip()
     today = date.today().isoformat()
-    cache_key = city.lower().replace(" ", "_")
-    cache_file = CACHE_DIR / f"weather_{cache_key}_{today}.json"
+    key_prefix = f"weather_{normalize_city(city).replace(' ', '_')}"
+    cache_key = f"{key_prefix}_{today}"
+    cache = get_cache_backend()
 
     # Check cache first
-    if cache_file.exists():
-        try:
-            with open(cache_file) as f:
-                data = json.load(f)
-                return _format_weather_response(city, data)
-        except (json.JSONDecodeError, KeyError):
-            pass  # Cache corrupted, fetch fresh data
+    data = cache.get(cache_key)
+    if data is not None:
+        return WeatherReport.from_observation(city, data, SOURCE_CACHE)
 
     # Get coordinates for the city
     coords = get_city_coordinates(city)
     if not coords:
         # City not in our list, use mock data
         data = get_mock_weather(city)
-        return _format_weather_response(city, data) + f" (Note: {city} coordinates not found, using estimated data)"
+        return WeatherReport.from_observation(
+            city, data, SOURCE_MOCK, f"Note: {city} coordinates not found, using estimated data"
+        )
+
+    # Too little of the query's latency budget left to wait on Open-Meteo
+    if budget_low():
+        stale = get_stale(cache, key_prefix)
+        if stale is not None:
+            data, day = stale
+            return WeatherReport.from_observation(city, data, SOURCE_CACHE, f"observed {day}, no time to refresh")
+        return WeatherReport.from_observation(city, get_mock_weather(city), SOURCE_MOCK, "estimated data, no time to fetch")
+
+    # Only one process/thread fetches a given city; the rest wait for its cache entry
+    with cache.lock(cache_key):
+        data = cache.get(cache_key)
+        if data is not None:
+            return WeatherReport.from_observation(city, data, SOURCE_CACHE)
+        return _fetch_weather(city, coords, cache_key)
+
+
+def get_weather(city: str = DEFAULT_CITY) -> str:
+    """
+    Get current weather for a city.
+
+    Args:
+        city: City name (default: "New York")
+              Supported cities: New York, London, Tokyo, San Francisco, Seattle
 
+    Returns:
+        A formatted string with the current weather conditions.
+    """
+    return ToolText.render(fetch_weather(city))
+
+
+def _fetch_weather(city: str, coords: tuple[float, float], cache_key: str) -> WeatherReport:
+    """Fetch current weather from the Open-Meteo API and cache it."""
     lat, lon = coords
 
     # Fetch from Open-Meteo API (no API key needed!)
     try:
-        url = "https://api.open-meteo.com/v1/forecast"
+        url = f"{OPEN_METEO_BASE_URL}/v1/forecast"
         params = {
             "latitude": lat,
             "longitude": lon,
             "current": "temperature_2m,weather_code",
             "timezone": "auto",
         }
-        response = requests.get(url, params=params, timeout=10)
+        response = upstream.get(url, params, "open-meteo")
         response.raise_for_status()
 
         result = response.json()
@@ -96,41 +99,18 @@ def get_weather(city: str = DEFAULT_CITY) -> str:
         data = {
             "temperature": current.get("temperature_2m", 20),
             "weather_code": current.get("weather_code", 0),
+            "fetched_at": time.time(),
         }
 
-        _save_to_cache(cache_file, data)
-        return _format_weather_response(city, data)
+        get_cache_backend().set(cache_key, data)
+        report = WeatherReport.from_observation(city, data, SOURCE_LIVE)
+        record_weather(report, lat, lon)
+        return report
 
     except requests.RequestException as e:
         # API error, fall back to mock data
         data = get_mock_weather(city)
-        return _format_weather_response(city, data) + f" (fallback due to API error: {e})"
-
-
-def _format_weather_response(city: str, data: dict) -> str:
-    """Format weather data into a human-readable string."""
-    temp = data.get("temperature", 20)
-    weather_code = data.get("weather_code", 0)
-
-    # Get condition from WMO code or use provided condition
-    condition = data.get("condition") or WMO_CODES.get(weather_code, "unknown")
-
-    # Check if it's rainy
-    is_rainy = weather_code in RAIN_CODES or "rain" in condition.lower()
-
-    if is_rainy:
-        return f"The weather in {city} is rainy with a temperature of {temp:.0f}°C."
-    else:
-        return f"The weather in {city} is {condition} with a temperature of {temp:.0f}°C."
-
-
-def _save_to_cache(cache_file: Path, data: dict) -> None:
-    """Save data to cache file."""
-    try:
-        with open(cache_file, "w") as f:
-            json.dump(data, f, indent=2)
-    except IOError:
-        pass  # Silently fail on cache write errors
+        return WeatherReport.from_observation(city, data, SOURCE_MOCK, f"fallback due to API error: {e}")
 
 
 if __name__ == "__main__":
@@ -138,3 +118,4 @@ if __name__ == "__main__":
     print(get_weather("New York"))
     print(get_weather("London"))
     print(get_weather("Tokyo"))
+    print(repr(fetch_weather("Tokyo")))